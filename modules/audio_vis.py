@@ -3,6 +3,8 @@ Audio Visualizer module.
 Uses WASAPI loopback to capture Windows audio output and perform FFT analysis.
 """
 
+import ctypes
+import math
 import threading
 import time
 
@@ -16,6 +18,57 @@ except ImportError:
     np = None
     sd = None
 
+# Optional FFTW backend (plan-cached RFFT on aligned buffers)
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+# Fallback FFT backend when pyFFTW is missing (float32-native, plan-cached)
+try:
+    from scipy.fft import rfft as scipy_rfft
+except ImportError:
+    scipy_rfft = None
+
+# Optional Numba JIT kernels: input prep (mixdown + window) and band extraction
+_prep = None
+_extract_bands = None
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _extract_bands(mags, lows, highs, boosts, amplitude, out):
+        """Average each [low, high) bin range, boost it and apply the log curve."""
+        inv_log40 = 1.0 / math.log10(40.0)
+        for b in range(len(lows)):
+            lo = lows[b]
+            hi = highs[b]
+            if hi <= lo:
+                out[b] = 0.0
+                continue
+            s = 0.0
+            for k in range(lo, hi):
+                s += mags[k]
+            v = (s / (hi - lo)) * amplitude * boosts[b]
+            if v <= 0.0001:
+                out[b] = 0.0
+            else:
+                out[b] = min(100.0, math.log10(1.0 + 39.0 * v) * inv_log40 * 100.0)
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _prep(indata, window, out):
+        """Mix stereo to mono and apply the window into out; returns the peak level."""
+        peak = 0.0
+        for i in range(len(window)):
+            m = 0.5 * (indata[i, 0] + indata[i, 1])
+            if abs(m) > peak:
+                peak = abs(m)
+            out[i] = m * window[i]
+        return peak
+except Exception:
+    _prep = None
+    _extract_bands = None
+
 
 class AudioVisualizer:
     """
@@ -31,6 +84,15 @@ class AudioVisualizer:
     HIGH_MID_LOW = 2000 # Hz
     HIGH_MID_HIGH = 6000 # Hz
     
+    # Blocks quieter than this (peak amplitude) skip the FFT entirely
+    SILENCE_THRESHOLD = 1e-5
+    SILENCE_DECAY = 0.85
+    
+    THREAD_PRIORITY_TIME_CRITICAL = 15
+    
+    # Resolution of the log-compression lookup table over val in [0, 1]
+    LUT_SIZE = 2048
+    
     def __init__(self, num_cpu_cores=8):
         """Initialize the audio visualizer.
         
@@ -44,28 +106,80 @@ class AudioVisualizer:
         self.sample_rate = 44100
         self.block_size = 2048  # FFT size
         
-        # Magnitude values (0-100 scale for bar display)
-        self._lock = threading.Lock()
-        self._ram_magnitude = 0.0       # Bass (60-120 Hz)
-        self._swap_magnitude = 0.0      # Low-mid (120-500 Hz)  
-        self._disk_magnitude = 0.0      # High-mid (2-6 kHz)
-        self._cpu_magnitudes = [0.0] * num_cpu_cores  # Log-spaced bands
+        # Hann window is cached and only rebuilt if the block length changes
+        self._window = np.hanning(self.block_size).astype(np.float32)
+        self._window_len = self.block_size
+        
+        # Reusable buffer for the stereo -> mono mixdown
+        self._mono_buf = np.empty(self.block_size, dtype=np.float32)
+        
+        # FFT input buffer (the window is multiplied straight into it) and, with
+        # pyFFTW, a plan over aligned buffers (None -> numpy fallback)
+        self._fft = None
+        self._fft_in = np.empty(self.block_size, dtype=np.float32)
+        self._fft_out = None
+        self._build_fft_plan()
+        
+        # Reusable buffer for the FFT magnitudes
+        self._mag_buf = np.empty(self.block_size // 2 + 1, dtype=np.float32)
+        
+        # Magnitude values (0-100 scale for bar display), double-buffered:
+        # [ram (60-120 Hz), swap (120-500 Hz), disk (2-6 kHz), cpu_0..cpu_n (log-spaced)]
+        # The audio thread writes the back buffer then flips _active_idx, so
+        # readers never need a lock.
+        self._bufs = [np.zeros(3 + num_cpu_cores, dtype=np.float32),
+                      np.zeros(3 + num_cpu_cores, dtype=np.float32)]
+        self._active_idx = 0
+        
+        # Set after every buffer flip so the renderer can wait for new data
+        # instead of polling on a fixed interval
+        self.frame_ready = threading.Event()
         
         # Audio stream
         self._stream = None
         self._running = False
+        self._loopback_device = None  # memoized _find_loopback_device() result
+        self._priority_set = False     # audio thread priority raised yet?
+        
+        # Pre-compute CPU frequency band edges (log-spaced from 200Hz to 16kHz)
+        self._cpu_freq_edges = self._compute_cpu_bands()
         
-        # Pre-compute CPU frequency bands (log-spaced from 200Hz to 16kHz)
-        self._cpu_freq_bands = self._compute_cpu_bands()
+        # Pre-compute FFT bin ranges for all bands (recomputed on sample_rate change)
+        self._compute_band_layout()
+        self._recompute_bins()
         
         # Global amplitude multiplier for fine-tuning
         self.amplitude = 2.0
         
+        # Compile the JIT kernels now rather than inside the first audio callback
+        self._use_jit = False
+        if _extract_bands is not None and _prep is not None:
+            try:
+                _prep(np.zeros((self.block_size, 2), dtype=np.float32), self._window, self._fft_in)
+                _extract_bands(np.zeros(self.block_size // 2 + 1, dtype=np.float32),
+                               self._band_lows, self._band_highs, self._band_boosts_arr,
+                               self.amplitude, self._band_out)
+                self._use_jit = True
+            except Exception:
+                self._use_jit = False
+        
         # Smoothing factor (0-1, higher = smoother but less responsive)
         self._smoothing = 0.4
+        
+        # Constant denominator of the log curve used by the band scaling
+        self._inv_log10_40 = 1.0 / math.log10(40.0)
+        
+        # Log curve as a lookup table. The curve hits 100 at val=1.0 and the
+        # result is clamped there anyway, so [0, 1] covers the whole range.
+        lut_x = np.linspace(0.0, 1.0, self.LUT_SIZE)
+        self._lut = (np.log10(1.0 + 39.0 * lut_x) * self._inv_log10_40 * 100.0).astype(np.float32)
+        self._lut_scale = float(self.LUT_SIZE - 1)
     
     def _compute_cpu_bands(self):
-        """Compute log-spaced frequency bands for CPU cores."""
+        """Compute log-spaced frequency band edges for CPU cores.
+        
+        Returns n+1 contiguous edges; band i spans edges[i]..edges[i+1].
+        """
         # Log-space from 200Hz to 16kHz
         min_freq = 200
         max_freq = 16000
@@ -73,103 +187,181 @@ class AudioVisualizer:
         # Generate n+1 edges for n bands
         log_min = np.log10(min_freq)
         log_max = np.log10(max_freq)
-        edges = np.logspace(log_min, log_max, self.num_cpu_cores + 1)
-        
-        # Return list of (low, high) tuples
-        return [(edges[i], edges[i+1]) for i in range(self.num_cpu_cores)]
+        return np.logspace(log_min, log_max, self.num_cpu_cores + 1)
     
-    def _freq_to_bin(self, freq):
-        """Convert frequency to FFT bin index."""
-        return int(freq * self.block_size / self.sample_rate)
+    def _compute_band_layout(self):
+        """Collect the frequency range and boost of every band: ram, swap, disk, then cpu cores."""
+        fixed = np.array([
+            (self.BASS_LOW, self.BASS_HIGH),
+            (self.LOW_MID_LOW, self.LOW_MID_HIGH),
+            (self.HIGH_MID_LOW, self.HIGH_MID_HIGH),
+        ], dtype=np.float64)
+        edges = self._cpu_freq_edges
+        cpu = np.column_stack((edges[:-1], edges[1:]))
+        self._band_freqs = np.ascontiguousarray(np.vstack((fixed, cpu)))
+        
+        # Apply mild weighting to balance spectrum (bass is naturally strong),
+        # plus a progressive boost for higher cpu bands
+        n = self.num_cpu_cores
+        boosts = [0.7, 1.0, 1.3] + [1.0 + (i / n) * 2.5 for i in range(n)]
+        self._band_boosts_arr = np.array(boosts, dtype=np.float32)
+        self._band_out = np.zeros(len(self._band_freqs), dtype=np.float32)
     
-    def _get_band_magnitude(self, fft_magnitudes, low_freq, high_freq):
-        """Get average magnitude for a frequency band."""
-        low_bin = max(1, self._freq_to_bin(low_freq))
-        high_bin = min(len(fft_magnitudes) - 1, self._freq_to_bin(high_freq))
+    def _recompute_bins(self):
+        """Convert band frequencies to FFT bin indices for the current sample_rate/block_size.
         
-        if high_bin <= low_bin:
-            return 0.0
+        Bins are stored as interleaved (low, high) pairs so a single
+        np.add.reduceat() yields every band sum at the even output slots.
+        """
+        last_bin = self.block_size // 2
+        bins = (self._band_freqs * (self.block_size / self.sample_rate)).astype(np.int64)
+        lows = np.clip(bins[:, 0], 1, last_bin)
+        highs = np.minimum(bins[:, 1], last_bin)
         
-        # Average magnitude in band
-        band = fft_magnitudes[low_bin:high_bin]
-        if len(band) == 0:
-            return 0.0
+        self._band_lows = lows.astype(np.int32)
+        self._band_highs = highs.astype(np.int32)
         
-        return float(np.mean(band))
+        self._band_idx = np.empty(2 * len(lows), dtype=np.int64)
+        self._band_idx[0::2] = lows
+        self._band_idx[1::2] = highs
+        self._band_valid = highs > lows
+        self._band_widths = np.maximum(highs - lows, 1).astype(np.float32)
+    
+    def _build_fft_plan(self):
+        """Plan the real FFT once with pyFFTW, if it is installed."""
+        if pyfftw is None:
+            return
+        try:
+            self._fft_in = pyfftw.empty_aligned(self.block_size, dtype='float32')
+            self._fft_out = pyfftw.empty_aligned(self.block_size // 2 + 1, dtype='complex64')
+            self._fft = pyfftw.FFTW(self._fft_in, self._fft_out, direction='FFTW_FORWARD',
+                                    flags=('FFTW_MEASURE',), threads=1)
+        except Exception:
+            self._fft = None
+            self._fft_in = np.empty(self.block_size, dtype=np.float32)
+            self._fft_out = None
     
     def _audio_callback(self, indata, frames, time_info, status):
         """Process incoming audio data."""
         if status:
             pass  # Ignore status messages
         
-        # Convert to mono if stereo
-        if len(indata.shape) > 1:
-            audio = np.mean(indata, axis=1)
+        if not self._priority_set:
+            self._priority_set = True
+            self._raise_thread_priority()
+        
+        n = len(indata)
+        fused = (self._use_jit and indata.ndim > 1 and indata.shape[1] == 2
+                 and n == len(self._fft_in) and n == self._window_len)
+        
+        if fused:
+            # Mixdown + window straight into the FFT input in one compiled pass
+            peak = _prep(indata, self._window, self._fft_in)
         else:
-            audio = indata.flatten()
+            # Convert to mono if stereo (stay in float32 end-to-end)
+            if indata.ndim > 1 and indata.shape[1] == 2 and n == len(self._mono_buf):
+                np.add(indata[:, 0], indata[:, 1], out=self._mono_buf)
+                np.multiply(self._mono_buf, 0.5, out=self._mono_buf)
+                audio = self._mono_buf
+            elif indata.ndim > 1 and indata.shape[1] > 1:
+                audio = indata.mean(axis=1, dtype=np.float32)
+            else:
+                audio = indata.reshape(-1).astype(np.float32, copy=False)
+            peak = max(float(audio.max()), -float(audio.min())) if n else 0.0
+        
+        # Silence gate: paused player / gap between tracks -> just let the bars decay
+        if peak < self.SILENCE_THRESHOLD:
+            idx = self._active_idx
+            np.multiply(self._bufs[idx], self.SILENCE_DECAY, out=self._bufs[1 - idx])
+            self._active_idx = 1 - idx
+            self.frame_ready.set()
+            return
         
         # Apply window and compute FFT
-        window = np.hanning(len(audio))
-        windowed = audio * window
-        fft = np.fft.rfft(windowed)
-        magnitudes = np.abs(fft)
+        if not fused and n != self._window_len:
+            self._window = np.hanning(n).astype(np.float32)
+            self._window_len = n
+        if n == len(self._fft_in):
+            if not fused:
+                np.multiply(audio, self._window, out=self._fft_in)
+            if self._fft is not None:
+                self._fft()
+                fft = self._fft_out
+            elif scipy_rfft is not None:
+                fft = scipy_rfft(self._fft_in, overwrite_x=True)
+            else:
+                fft = np.fft.rfft(self._fft_in)
+        else:
+            windowed = audio * self._window
+            fft = np.fft.rfft(windowed)
+        if len(fft) == len(self._mag_buf):
+            magnitudes = np.abs(fft, out=self._mag_buf)
+        else:
+            magnitudes = np.abs(fft)
         
         # Normalize by block size to get approx 0-1 range
         # Increasing the divisor makes it more sensitive (e.g., /12 instead of /4)
-        magnitudes = magnitudes / (len(audio) / 12)
-        
-        # Extract band magnitudes using a custom scaling
-        # We don't normalize the whole array anymore, so volume is preserved.
+        magnitudes *= 12.0 / n
         
-        def get_scaled_mag(low, high, boost=1.0):
-            val = self._get_band_magnitude(magnitudes, low, high)
-            
+        if self._use_jit and len(magnitudes) == self.block_size // 2 + 1:
+            # Fused reduce + scale in one compiled pass over the FFT bins
+            _extract_bands(magnitudes, self._band_lows, self._band_highs,
+                           self._band_boosts_arr, self.amplitude, self._band_out)
+            scaled = self._band_out
+        else:
+            # Average magnitude of every band in one C-level pass
+            band_idx = self._band_idx
+            if len(magnitudes) != self.block_size // 2 + 1:
+                band_idx = np.minimum(band_idx, len(magnitudes) - 1)
+            sums = np.add.reduceat(magnitudes, band_idx)[0::2]
+            means = np.where(self._band_valid, sums / self._band_widths, 0.0)
+
             # Apply global amplitude and local boost
-            val = val * self.amplitude * boost
-            
-            if val <= 0.0001: 
-                return 0.0
+            vals = means * (self.amplitude * self._band_boosts_arr)
             
-            # Sharper log curve to boost low-level signals more aggressively
+            # Sharper log curve to boost low-level signals more aggressively,
+            # read from the lookup table in one gather over all bands
             # val=0.01 -> 0.17
             # val=0.1 -> 0.47
-            # val=1.0 -> 1.0
-            scaled = np.log10(1 + 39 * val) / np.log10(40)
-            
-            return min(100.0, scaled * 100.0)
-
-        # Apply mild weighting to balance spectrum (bass is naturally strong)
-        ram_mag = get_scaled_mag(self.BASS_LOW, self.BASS_HIGH, boost=0.7) # Bass
-        swap_mag = get_scaled_mag(self.LOW_MID_LOW, self.LOW_MID_HIGH, boost=1.0) # Low Mid
-        disk_mag = get_scaled_mag(self.HIGH_MID_LOW, self.HIGH_MID_HIGH, boost=1.3) # High Mid
-        
-        cpu_mags = []
-        for i, (low, high) in enumerate(self._cpu_freq_bands):
-            # Progressive boost for higher cpu bands
-            freq_boost = 1.0 + (i / len(self._cpu_freq_bands)) * 2.5
-            mag = get_scaled_mag(low, high, boost=freq_boost)
-            cpu_mags.append(mag)
-        
-        # Apply smoothing and update shared state
-        with self._lock:
-            self._ram_magnitude = self._smooth(self._ram_magnitude, ram_mag)
-            self._swap_magnitude = self._smooth(self._swap_magnitude, swap_mag)
-            self._disk_magnitude = self._smooth(self._disk_magnitude, disk_mag)
-            
-            for i, mag in enumerate(cpu_mags):
-                if i < len(self._cpu_magnitudes):
-                    self._cpu_magnitudes[i] = self._smooth(self._cpu_magnitudes[i], mag)
+            # val>=1.0 -> 1.0
+            lut_idx = np.minimum(vals * self._lut_scale + 0.5, self.LUT_SIZE - 1).astype(np.int32)
+            scaled = np.where(vals > 0.0001, self._lut[lut_idx], 0.0).astype(np.float32)
+        
+        # Apply smoothing into the back buffer, then publish it
+        # (exponential smoothing over the whole band vector at once)
+        idx = self._active_idx
+        back = self._bufs[1 - idx]
+        np.multiply(self._bufs[idx], self._smoothing, out=back)
+        back += scaled * (1.0 - self._smoothing)
+        self._active_idx = 1 - idx
+        self.frame_ready.set()
     
-    def _smooth(self, old_val, new_val):
-        """Apply exponential smoothing."""
-        return old_val * self._smoothing + new_val * (1 - self._smoothing)
+    def _raise_thread_priority(self):
+        """Bump the PortAudio callback thread to time-critical priority (Windows only)."""
+        try:
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), self.THREAD_PRIORITY_TIME_CRITICAL)
+        except Exception:
+            pass
     
     def _find_loopback_device(self):
         """
         Pick the best audio source:
         1. Virtual Output (Voicemeeter B1/B2, VB-Cable) - Direct Capture
         2. System Default Output - WASAPI Loopback
+        
+        A successful result is memoized so restarting capture doesn't rescan devices.
         """
+        if self._loopback_device is not None:
+            return self._loopback_device
+        
+        result = self._scan_loopback_device()
+        if result[0] is not None:
+            self._loopback_device = result
+        return result
+    
+    def _scan_loopback_device(self):
+        """Scan PortAudio devices for the best capture source (see _find_loopback_device)."""
         try:
             devices = sd.query_devices()
             host_apis = sd.query_hostapis()
@@ -179,7 +371,7 @@ class AudioVisualizer:
             try:
                 idx = sd.default.device[1]
                 if idx is not None:
-                    def_out = sd.query_devices(idx)
+                    def_out = devices[idx]
             except: pass
             
             candidates = []
@@ -246,8 +438,10 @@ class AudioVisualizer:
         try:
             dev_info = sd.query_devices(device_id)
             default_rate = int(dev_info.get('default_samplerate', 48000))
-            if default_rate not in sample_rates:
-                sample_rates.insert(0, default_rate)
+            # Device's own rate first - it's the one most likely to open
+            if default_rate in sample_rates:
+                sample_rates.remove(default_rate)
+            sample_rates.insert(0, default_rate)
         except: pass
 
         for rate in sample_rates:
@@ -272,6 +466,13 @@ class AudioVisualizer:
         # CRITICAL: We DO NOT fall back to device=None here.
         # device=None opens the Default Input (Mic), which we strictly want to avoid.
         
+        # Drop combinations PortAudio already knows are invalid instead of paying
+        # for a full open/start/fail cycle. Some loopback drivers misreport, so if
+        # nothing validates we still try everything.
+        valid_configs = [c for c in configs_to_try if self._check_config(c)]
+        if valid_configs:
+            configs_to_try = valid_configs
+        
         for config in configs_to_try:
             try:
                 extra = config.pop('extra_settings')
@@ -281,15 +482,32 @@ class AudioVisualizer:
                 else:
                     self._stream = sd.InputStream(callback=self._audio_callback, **config)
                 
+                # Bins must match the real rate before the first callback fires
+                self.sample_rate = actual_rate
+                self._recompute_bins()
                 self._stream.start()
                 self._running = True
-                self.sample_rate = actual_rate
                 return True
             except Exception:
                 continue
         
         return False
     
+    def _check_config(self, config):
+        """Cheaply validate a stream config with PortAudio without opening it."""
+        try:
+            kwargs = {
+                'device': config['device'],
+                'channels': config['channels'],
+                'samplerate': config['samplerate'],
+            }
+            if config.get('extra_settings'):
+                kwargs['extra_settings'] = config['extra_settings']
+            sd.check_input_settings(**kwargs)
+            return True
+        except Exception:
+            return False
+    
     def _get_wasapi_settings(self, loopback=False):
         """Get WASAPI settings."""
         try:
@@ -309,11 +527,8 @@ class AudioVisualizer:
             self._stream = None
         
         # Reset magnitudes
-        with self._lock:
-            self._ram_magnitude = 0.0
-            self._swap_magnitude = 0.0
-            self._disk_magnitude = 0.0
-            self._cpu_magnitudes = [0.0] * self.num_cpu_cores
+        for buf in self._bufs:
+            buf.fill(0.0)
     
     def get_magnitudes(self):
         """Get current frequency band magnitudes.
@@ -322,13 +537,13 @@ class AudioVisualizer:
             dict with keys: 'ram', 'swap', 'disk', 'cpu' (list)
             All values are 0-100 scale suitable for bar display.
         """
-        with self._lock:
-            return {
-                'ram': self._ram_magnitude,
-                'swap': self._swap_magnitude,
-                'disk': self._disk_magnitude,
-                'cpu': list(self._cpu_magnitudes)
-            }
+        snap = self._bufs[self._active_idx].copy()
+        return {
+            'ram': float(snap[0]),
+            'swap': float(snap[1]),
+            'disk': float(snap[2]),
+            'cpu': snap[3:].tolist()
+        }
     
     @property
     def is_running(self):
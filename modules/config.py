@@ -13,6 +13,10 @@ C_DIM = "\033[2m"
 C_BG_DARK = "\033[48;5;236m"
 C_BG_HEADER = "\033[48;5;238m"
 
+# Cursor/screen control, pre-encoded for the byte-level frame writer
+CLEAR_SCREEN_B = b"\033[2J"
+CLEAR_BELOW_B = b"\033[J"
+
 # Configuration
 REFRESH_RATES = {
     "slow": 3.0,
@@ -23,3 +27,33 @@ REFRESH_RATES = {
     # so for about 60 fps:
     "party": 0.0167
 }
+
+# Minimum seconds between CPU samples; faster calls reuse the last values
+# (Windows' CPU time counters don't resolve much finer than this)
+CPU_SAMPLE_MIN_INTERVAL = 0.08
+
+# Adaptive refresh: while total CPU% is steadier than ADAPTIVE_TARGET_NOISE (its
+# EMA standard deviation, in %), stats refresh up to ADAPTIVE_MAX_STRETCH times
+# slower than the selected speed. A keypress restores the nominal rate for
+# INPUT_BOOST_SECONDS. No stretching until ADAPTIVE_WARMUP_SAMPLES samples have
+# fed the EMA (its variance starts at 0, which would read as perfectly steady).
+ADAPTIVE_TARGET_NOISE = 5.0
+ADAPTIVE_MAX_STRETCH = 8.0
+ADAPTIVE_EMA_ALPHA = 0.3
+INPUT_BOOST_SECONDS = 2.0
+ADAPTIVE_WARMUP_SAMPLES = 5
+
+# Seconds between checks for a minimized console window; while minimized,
+# sampling and drawing stop and the loop wakes at most this often
+MINIMIZED_CHECK_INTERVAL = 1.0
+
+# CPU core grid layout: bars per row and the widest a core bar may grow
+CORES_PER_ROW = 3
+MAX_CORE_BAR_WIDTH = 25
+
+# Seconds between background GPU polls
+GPU_POLL_INTERVAL = 2.0
+
+# Seconds partition layout / drive usage stay cached (TTL)
+PARTITION_SCAN_INTERVAL = 60.0
+DISK_USAGE_INTERVAL = 30.0
@@ -0,0 +1,154 @@
+"""Win32 console helpers"""
+import ctypes
+import ctypes.wintypes as wt
+import msvcrt
+import sys
+
+kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+user32 = ctypes.WinDLL("user32", use_last_error=True)
+winmm = ctypes.WinDLL("winmm")
+
+STD_INPUT_HANDLE = -10
+STD_OUTPUT_HANDLE = -11
+WAIT_OBJECT_0 = 0
+CTRL_C_EVENT = 0
+CTRL_BREAK_EVENT = 1
+ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+CP_UTF8 = 65001
+TIMERR_NOERROR = 0
+
+kernel32.GetStdHandle.argtypes = [wt.DWORD]
+kernel32.GetStdHandle.restype = wt.HANDLE
+kernel32.WaitForSingleObject.argtypes = [wt.HANDLE, wt.DWORD]
+kernel32.WaitForSingleObject.restype = wt.DWORD
+kernel32.GetConsoleMode.argtypes = [wt.HANDLE, ctypes.POINTER(wt.DWORD)]
+kernel32.GetConsoleMode.restype = wt.BOOL
+kernel32.SetConsoleMode.argtypes = [wt.HANDLE, wt.DWORD]
+kernel32.SetConsoleMode.restype = wt.BOOL
+kernel32.GetConsoleOutputCP.argtypes = []
+kernel32.GetConsoleOutputCP.restype = wt.UINT
+kernel32.SetConsoleOutputCP.argtypes = [wt.UINT]
+kernel32.SetConsoleOutputCP.restype = wt.BOOL
+
+class INPUT_RECORD(ctypes.Structure):
+    _fields_ = [
+        ("EventType", wt.WORD),
+        ("Event", wt.DWORD * 4),  # union of the event records; contents not needed
+    ]
+
+kernel32.PeekConsoleInputW.argtypes = [wt.HANDLE, ctypes.POINTER(INPUT_RECORD), wt.DWORD, ctypes.POINTER(wt.DWORD)]
+kernel32.PeekConsoleInputW.restype = wt.BOOL
+kernel32.ReadConsoleInputW.argtypes = [wt.HANDLE, ctypes.POINTER(INPUT_RECORD), wt.DWORD, ctypes.POINTER(wt.DWORD)]
+kernel32.ReadConsoleInputW.restype = wt.BOOL
+kernel32.GetConsoleWindow.argtypes = []
+kernel32.GetConsoleWindow.restype = wt.HWND
+user32.IsIconic.argtypes = [wt.HWND]
+user32.IsIconic.restype = wt.BOOL
+winmm.timeBeginPeriod.argtypes = [wt.UINT]
+winmm.timeBeginPeriod.restype = wt.UINT
+winmm.timeEndPeriod.argtypes = [wt.UINT]
+winmm.timeEndPeriod.restype = wt.UINT
+
+HANDLER_ROUTINE = ctypes.WINFUNCTYPE(wt.BOOL, wt.DWORD)
+kernel32.SetConsoleCtrlHandler.argtypes = [HANDLER_ROUTINE, wt.BOOL]
+kernel32.SetConsoleCtrlHandler.restype = wt.BOOL
+
+_stdin_handle = kernel32.GetStdHandle(wt.DWORD(STD_INPUT_HANDLE).value)
+_stdout_handle = kernel32.GetStdHandle(wt.DWORD(STD_OUTPUT_HANDLE).value)
+_input_records = (INPUT_RECORD * 64)()
+_console_hwnd = kernel32.GetConsoleWindow()
+
+def enable_vt_output():
+    """Turn on ANSI/VT escape processing for the console output. Returns False if unsupported."""
+    mode = wt.DWORD()
+    if not kernel32.GetConsoleMode(_stdout_handle, ctypes.byref(mode)):
+        return False
+    return bool(kernel32.SetConsoleMode(_stdout_handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING))
+
+def set_utf8_output():
+    """Switch the console output code page to UTF-8. Returns the previous one (0 if unknown) for restore_output_cp()."""
+    prev = kernel32.GetConsoleOutputCP()
+    kernel32.SetConsoleOutputCP(CP_UTF8)
+    return prev
+
+def restore_output_cp(cp):
+    """Put back the code page set_utf8_output() returned."""
+    if cp:
+        kernel32.SetConsoleOutputCP(cp)
+
+def begin_timer_resolution(period_ms=1):
+    """
+    Raise the system timer resolution to `period_ms` while the app runs.
+
+    Before 3.11, time.sleep only wakes on the system timer tick (~15.6ms),
+    which swallows the high-speed modes' 1-8ms sleeps. 3.11+ sleeps on a
+    high-resolution waitable timer already, so the global setting is left
+    alone there. Returns the period to pass to end_timer_resolution() (0 if
+    nothing was changed).
+    """
+    if sys.version_info >= (3, 11):
+        return 0
+    return period_ms if winmm.timeBeginPeriod(period_ms) == TIMERR_NOERROR else 0
+
+def end_timer_resolution(period_ms):
+    """Undo begin_timer_resolution() (each timeBeginPeriod needs a matching timeEndPeriod)."""
+    if period_ms:
+        winmm.timeEndPeriod(period_ms)
+
+def wait_for_input(timeout):
+    """
+    Block until console input is pending or `timeout` seconds pass.
+
+    The console input handle is signaled while its buffer holds any event, so
+    this wakes immediately on a keypress instead of polling. Returns True if
+    input is pending (which may also be a mouse/focus/resize event).
+    """
+    ms = max(0, int(timeout * 1000))
+    return kernel32.WaitForSingleObject(_stdin_handle, ms) == WAIT_OBJECT_0
+
+def discard_non_key_input():
+    """
+    Drop queued input records that carry no keystroke, returning True if a key is pending.
+
+    The handle stays signaled while any record is queued, including the key-up
+    that msvcrt.getwch() leaves behind and focus/mouse events, none of which
+    kbhit()/getwch() ever remove. Only records peeked before kbhit() reported
+    no key are read, so a key arriving in between is kept.
+    """
+    count = wt.DWORD()
+    while (kernel32.PeekConsoleInputW(_stdin_handle, _input_records, len(_input_records), ctypes.byref(count))
+           and count.value):
+        if msvcrt.kbhit():
+            return True
+        kernel32.ReadConsoleInputW(_stdin_handle, _input_records, count.value, ctypes.byref(count))
+    return False
+
+def is_console_minimized():
+    """
+    True if the console window is minimized (nothing drawn would be seen).
+
+    Always False without a console window of our own, e.g. under a pseudo
+    console whose host window is never iconic.
+    """
+    return bool(_console_hwnd) and bool(user32.IsIconic(_console_hwnd))
+
+_ctrl_handler = None  # keeps the ctypes callback alive while registered
+
+def install_ctrl_handler(on_break):
+    """
+    Call `on_break()` on Ctrl+C / Ctrl+Break instead of raising KeyboardInterrupt.
+
+    The console invokes the handler on its own thread; returning TRUE marks the
+    event handled, so Python's SIGINT machinery never sees it. Other events
+    (close, logoff, shutdown) fall through to the default handling.
+    """
+    global _ctrl_handler
+    
+    def handler(event):
+        if event in (CTRL_C_EVENT, CTRL_BREAK_EVENT):
+            on_break()
+            return True
+        return False
+    
+    _ctrl_handler = HANDLER_ROUTINE(handler)
+    return bool(kernel32.SetConsoleCtrlHandler(_ctrl_handler, True))
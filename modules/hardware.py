@@ -1,10 +1,132 @@
 """Hardware info module"""
+import atexit
+import base64
 import psutil
+import queue
+import re
 import time
 import subprocess
 import sys
+import threading
 from .state import state
 from .config import *
+from .utils import ttl_cache
+
+# Optional NVML bindings (nvidia-ml-py): in-process GPU queries instead of spawning nvidia-smi
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+def _nvml_shutdown():
+    """Release NVML at exit."""
+    try:
+        pynvml.nvmlShutdown()
+    except Exception:
+        pass
+
+def _probe_allowed(name, now):
+    """Whether a GPU query method may run, i.e. it isn't backing off after failures."""
+    fails, next_retry = state.gpu_probe_backoff.get(name, (0, 0))
+    return fails == 0 or now >= next_retry
+
+def _probe_result(name, ok, now):
+    """Record a GPU query outcome; failures back off exponentially (1 min -> 1 h)."""
+    if ok:
+        state.gpu_probe_backoff[name] = (0, 0)
+    else:
+        fails = state.gpu_probe_backoff.get(name, (0, 0))[0] + 1
+        state.gpu_probe_backoff[name] = (fails, now + min(3600, 60 * 2 ** (fails - 1)))
+
+def _get_nvml_handle():
+    """Initialize NVML once and cache the first GPU's handle (None if no NVIDIA driver)."""
+    if not state.nvml_checked:
+        state.nvml_checked = True
+        try:
+            pynvml.nvmlInit()
+        except Exception:
+            return None
+        try:
+            state.nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            atexit.register(_nvml_shutdown)
+        except Exception:
+            _nvml_shutdown()
+    return state.nvml_handle
+
+# Persistent PowerShell: starting powershell.exe costs ~300ms, so one process is
+# kept alive and scripts are piped through its stdin instead of spawning per query
+_PS_SENTINEL = "<<END>>"
+_ps_lock = threading.Lock()  # queries come from both the main and GPU poll threads
+
+def _ps_reader(proc, lines):
+    """Forward the PowerShell process's stdout lines into a queue (None at EOF)."""
+    try:
+        for line in proc.stdout:
+            lines.put(line)
+    except Exception:
+        pass
+    lines.put(None)
+
+def _ps_stop():
+    """Kill the persistent PowerShell process (also registered with atexit)."""
+    proc = state.ps_proc
+    state.ps_proc = None
+    if proc is not None:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+atexit.register(_ps_stop)
+
+def _ps_start():
+    """Launch the persistent PowerShell process and its stdout reader thread."""
+    proc = subprocess.Popen(
+        ['powershell', '-NoProfile', '-NonInteractive', '-Command', '-'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, errors="replace",
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+    state.ps_proc = proc
+    state.ps_lines = queue.Queue()
+    threading.Thread(target=_ps_reader, args=(proc, state.ps_lines),
+                     name="ps-reader", daemon=True).start()
+
+def _ps_query(script, timeout):
+    """Run a script in the persistent PowerShell and return its stdout.
+    
+    The script is sent base64-encoded as a single line (stdin mode would otherwise
+    choke on multi-line blocks), followed by a sentinel marking the end of its output.
+    On timeout the process is killed and restarted by the next query.
+    """
+    encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+    with _ps_lock:
+        if state.ps_proc is None or state.ps_proc.poll() is not None:
+            _ps_start()
+        lines = state.ps_lines
+        state.ps_proc.stdin.write(
+            "& ([scriptblock]::Create([Text.Encoding]::UTF8.GetString("
+            f"[Convert]::FromBase64String('{encoded}'))))\n'{_PS_SENTINEL}'\n"
+        )
+        state.ps_proc.stdin.flush()
+        
+        output = []
+        deadline = time.time() + timeout
+        while True:
+            try:
+                line = lines.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                _ps_stop()
+                raise subprocess.TimeoutExpired("powershell", timeout)
+            if line is None:
+                _ps_stop()
+                raise OSError("PowerShell process exited")
+            if line.rstrip() == _PS_SENTINEL:
+                return "".join(output)
+            output.append(line)
+
+# iGPU detection: AMD APUs carry a 'G' model suffix (e.g. Ryzen 5 5600G)
+_APU_RE = re.compile(r'\d{4}G\b')
 
 # GPU Detection (cached)
 def get_gpu_info():
@@ -24,91 +146,143 @@ def get_gpu_info():
         "is_igpu": False  # True for integrated graphics (AMD G / Intel)
     }
     
-    # Try nvidia-smi first (discrete NVIDIA GPU)
-    try:
-        result = subprocess.run(
-            ['nvidia-smi', '--query-gpu=name,utilization.gpu,memory.used,memory.total',
-             '--format=csv,noheader,nounits'],
-            capture_output=True, text=True, timeout=5,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            parts = result.stdout.strip().split(',')
-            if len(parts) >= 4:
-                gpu_stats["name"] = parts[0].strip()[:40]
-                gpu_stats["util"] = float(parts[1].strip())
-                gpu_stats["mem_used"] = int(float(parts[2].strip())) * 1024 * 1024  # MB to bytes
-                gpu_stats["mem_total"] = int(float(parts[3].strip())) * 1024 * 1024
+    # Discrete NVIDIA GPU: NVML if the bindings are installed, nvidia-smi otherwise
+    if pynvml is not None:
+        handle = _get_nvml_handle()
+        if handle is not None:
+            try:
+                name = pynvml.nvmlDeviceGetName(handle)
+                if isinstance(name, bytes):
+                    name = name.decode(errors="ignore")
+                mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+                gpu_stats["name"] = name.strip()[:40]
+                gpu_stats["util"] = float(pynvml.nvmlDeviceGetUtilizationRates(handle).gpu)
+                gpu_stats["mem_used"] = int(mem.used)
+                gpu_stats["mem_total"] = int(mem.total)
                 gpu_stats["available"] = True
                 gpu_stats["is_igpu"] = False
                 state.gpu_cache = (gpu_stats, now)
                 return gpu_stats
-    except (subprocess.TimeoutExpired, FileNotFoundError, ValueError):
-        pass
+            except Exception:
+                pass
+    elif _probe_allowed("nvidia", now):
+        nvidia_ok = False
+        try:
+            result = subprocess.run(
+                ['nvidia-smi', '--query-gpu=name,utilization.gpu,memory.used,memory.total',
+                 '--format=csv,noheader,nounits'],
+                capture_output=True, text=True, timeout=5,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            nvidia_ok = result.returncode == 0 and bool(result.stdout.strip())
+            if nvidia_ok:
+                parts = result.stdout.strip().split(',')
+                if len(parts) >= 4:
+                    gpu_stats["name"] = parts[0].strip()[:40]
+                    gpu_stats["util"] = float(parts[1].strip())
+                    gpu_stats["mem_used"] = int(float(parts[2].strip())) * 1024 * 1024  # MB to bytes
+                    gpu_stats["mem_total"] = int(float(parts[3].strip())) * 1024 * 1024
+                    gpu_stats["available"] = True
+                    gpu_stats["is_igpu"] = False
+                    _probe_result("nvidia", True, now)
+                    state.gpu_cache = (gpu_stats, now)
+                    return gpu_stats
+        except (subprocess.TimeoutExpired, FileNotFoundError, ValueError):
+            pass
+        _probe_result("nvidia", nvidia_ok, now)
     
-    # Fallback: PowerShell WMI for GPU name
-    try:
-        result = subprocess.run(
-            ['powershell', '-NoProfile', '-Command',
-             '(Get-CimInstance Win32_VideoController | Select-Object -First 1).Name'],
-            capture_output=True, text=True, timeout=5,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            gpu_name = result.stdout.strip()[:40]
-            gpu_stats["name"] = gpu_name
-            gpu_stats["available"] = True
-            
-            # Detect if this is an integrated GPU
-            gpu_name_lower = gpu_name.lower()
-            
-            # Intel integrated graphics detection
-            if "intel" in gpu_name_lower and "arc" not in gpu_name_lower:
-                gpu_stats["is_igpu"] = True
-            elif "radeon graphics" in gpu_name_lower and "rx" not in gpu_name_lower:
-                gpu_stats["is_igpu"] = True
-            
-            # Also check CPU name for AMD APUs
-            cpu_name = state.sys_stats.get("cpu_name", "")
-            if cpu_name:
-                import re
-                match = re.search(r'\d{4}G\b', cpu_name)
-                if match:
-                    gpu_stats["is_igpu"] = True
-            
-            # For discrete GPUs (non-iGPU), try to get VRAM
-            if not gpu_stats["is_igpu"]:
-                vram_result = subprocess.run(
-                    ['powershell', '-NoProfile', '-Command',
-                     '(Get-CimInstance Win32_VideoController | Select-Object -First 1).AdapterRAM'],
-                    capture_output=True, text=True, timeout=5,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                if vram_result.returncode == 0 and vram_result.stdout.strip():
-                    try:
-                        vram = int(vram_result.stdout.strip())
-                        gpu_stats["mem_total"] = vram if vram > 0 else 0
-                    except ValueError:
-                        pass
-    except (subprocess.TimeoutExpired, Exception):
-        pass
+    # Fallback: WMI name/VRAM. These never change, so they are read once (normally
+    # by get_hardware_info's batched query) and reused on every poll.
+    if state.gpu_static is None and _probe_allowed("powershell", now):
+        ps_ok = False
+        try:
+            output = _ps_query(
+                "$g = Get-CimInstance -Query 'SELECT Name,AdapterRAM FROM Win32_VideoController' | "
+                "Select-Object -First 1; $g.Name + '|' + $g.AdapterRAM",
+                timeout=5
+            )
+            fields = output.strip().split("|")
+            ps_ok = bool(fields[0].strip())
+            if ps_ok:
+                state.gpu_static = _parse_gpu_static(fields[0], fields[1] if len(fields) > 1 else "")
+        except (subprocess.TimeoutExpired, Exception):
+            pass
+        _probe_result("powershell", ps_ok, now)
+    
+    if state.gpu_static is not None:
+        gpu_name, vram = state.gpu_static
+        gpu_stats["name"] = gpu_name
+        gpu_stats["available"] = True
+        
+        # Detect if this is an integrated GPU
+        gpu_name_lower = gpu_name.lower()
+        
+        # Intel integrated graphics detection
+        if "intel" in gpu_name_lower and "arc" not in gpu_name_lower:
+            gpu_stats["is_igpu"] = True
+        elif "radeon graphics" in gpu_name_lower and "rx" not in gpu_name_lower:
+            gpu_stats["is_igpu"] = True
+        
+        # Also check CPU name for AMD APUs
+        cpu_name = state.sys_stats.get("cpu_name", "")
+        if cpu_name and _APU_RE.search(cpu_name):
+            gpu_stats["is_igpu"] = True
+        
+        # For discrete GPUs (non-iGPU), report VRAM
+        if not gpu_stats["is_igpu"]:
+            gpu_stats["mem_total"] = vram
     
     state.gpu_cache = (gpu_stats, now)
     return gpu_stats
 
+def _parse_gpu_static(name, vram):
+    """Normalize a WMI (name, AdapterRAM) pair into the cached (name, vram_bytes) tuple."""
+    try:
+        vram = int(vram)
+    except (TypeError, ValueError):
+        vram = 0
+    return name.strip()[:40], max(vram, 0)
+
+def _gpu_poll_loop():
+    """Background loop keeping state.gpu_cache and state.smart_cache fresh so the render loop never waits on them."""
+    while state.app_running:
+        try:
+            get_gpu_info()
+        except Exception:
+            pass
+        try:
+            get_smart_status()  # internally cached for 120s
+        except Exception:
+            pass
+        time.sleep(GPU_POLL_INTERVAL)
+
+def start_gpu_poller():
+    """Start the GPU polling daemon thread (once)."""
+    if state.gpu_poller is not None:
+        return
+    state.gpu_poller = threading.Thread(target=_gpu_poll_loop, name="gpu-poll", daemon=True)
+    state.gpu_poller.start()
+
 def get_hardware_info():
-    """Fetch hardware info once at startup using PowerShell."""
+    """Fetch hardware info once at startup using a single PowerShell query.
+    
+    CPU name, boot disk name and GPU name/VRAM are emitted as one
+    'cpu|disk|gpu|vram' record. This also warms up the persistent PowerShell
+    process that later SMART/GPU queries reuse.
+    """
     if state.hw_info_fetched:
         return
 
     ps_cmd = r'''
+    $cpu = (Get-CimInstance -Query 'SELECT Name FROM Win32_Processor' | Select-Object -First 1).Name
+
     $disk = Get-Volume -DriveLetter C |
         Get-Partition |
         Get-Disk |
         Select-Object -First 1
 
     $friendly = $disk.FriendlyName
-    $model = Get-CimInstance Win32_DiskDrive |
+    $model = Get-CimInstance -Query 'SELECT Model,Index FROM Win32_DiskDrive' |
         Where-Object { $_.Index -eq $disk.Number } |
         Select-Object -First 1 -ExpandProperty Model
 
@@ -130,41 +304,39 @@ def get_hardware_info():
         $chosen = "$chosen $bus $size GB"
     }
 
-    $chosen
+    $gpu = Get-CimInstance -Query 'SELECT Name,AdapterRAM FROM Win32_VideoController' |
+        Select-Object -First 1
+
+    "$cpu|$chosen|$($gpu.Name)|$($gpu.AdapterRAM)"
     '''
 
+    fields = []
     try:
-        result = subprocess.run(
-            ['powershell', '-NoProfile', '-Command', 
-             '(Get-CimInstance Win32_Processor).Name'],
-            capture_output=True, text=True, timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            cpu_name = result.stdout.strip()
-            if " w/" in cpu_name:
-                cpu_name = cpu_name.split(" w/")[0]
-            state.sys_stats["cpu_name"] = cpu_name[:50]
-    except:
+        output = _ps_query(ps_cmd, timeout=15)
+        lines = [l for l in output.splitlines() if "|" in l]
+        if lines:
+            fields = [f.strip() for f in lines[-1].split("|")]
+    except Exception:
+        pass
+    fields += [""] * (4 - len(fields))
+    cpu_name, disk_name, gpu_name, vram = fields[:4]
+
+    if cpu_name:
+        if " w/" in cpu_name:
+            cpu_name = cpu_name.split(" w/")[0]
+        state.sys_stats["cpu_name"] = cpu_name[:50]
+    else:
         try:
             import platform
             state.sys_stats["cpu_name"] = platform.processor()[:50] or "Unknown CPU"
         except:
             pass
-    
-    try:
-        result = subprocess.run(
-            ['powershell', '-NoProfile', '-Command', ps_cmd],
-            capture_output=True, text=True, timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
 
-        name = result.stdout.strip()
-        if name:
-            state.sys_stats["disk_name"] = name[:40]
+    if disk_name:
+        state.sys_stats["disk_name"] = disk_name[:40]
 
-    except Exception as e:
-        pass
+    if gpu_name:
+        state.gpu_static = _parse_gpu_static(gpu_name, vram)
     
     state.hw_info_fetched = True
 
@@ -176,14 +348,10 @@ def get_smart_status():
         return state.smart_cache[0]
     
     try:
-        result = subprocess.run(
-            ['powershell', '-NoProfile', '-Command',
-             '(Get-PhysicalDisk | Select-Object -First 1).HealthStatus'],
-            capture_output=True, text=True, timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        
-        output = result.stdout.strip().lower()
+        output = _ps_query(
+            '(Get-PhysicalDisk | Select-Object -First 1).HealthStatus',
+            timeout=10
+        ).strip().lower()
         if "healthy" in output:
             status = f"{C_GREEN}Healthy{C_RESET}"
         elif "warning" in output:
@@ -203,13 +371,77 @@ def get_smart_status():
     return status
 
 def update_system_stats_fast():
-    """Update only CPU stats - for high-speed rendering modes."""
+    """Update only CPU stats - for high-speed rendering modes.
+    
+    Usage is derived from our own cpu_times(percpu=True) deltas: one call per
+    tick, no psutil cpu_percent bookkeeping, and the total falls out of the same
+    sums instead of a second pass over the per-core list.
+    
+    Returns True if a new sample was taken, False if skipped (too soon) or failed.
+    """
+    now = time.monotonic()  # immune to wall-clock steps, which would freeze sampling
+    if now - state.last_cpu_sample < CPU_SAMPLE_MIN_INTERVAL:
+        return False  # too soon for a meaningful delta; keep the current values
     try:
-        per_core = psutil.cpu_percent(percpu=True)
-        state.sys_stats["cpu_per_core"] = per_core
-        state.sys_stats["cpu_total"] = sum(per_core) / len(per_core) if per_core else 0
+        curr = psutil.cpu_times(percpu=True)
+        prev = state.prev_cpu_times
+        state.prev_cpu_times = curr
+        state.last_cpu_sample = now
+        if prev is None or len(prev) != len(curr):
+            return True  # baseline taken; usage needs the next sample
+        
+        # Reuse one list object across refreshes instead of rebinding the dict slot
+        buf = state.sys_stats["cpu_per_core"]
+        if len(buf) != len(curr):
+            buf[:] = [0.0] * len(curr)
+        all_busy = all_total = 0.0
+        for i, (c, p) in enumerate(zip(curr, prev)):
+            total = sum(c) - sum(p)
+            idle = c.idle - p.idle
+            busy = total - idle
+            buf[i] = min(100.0, max(0.0, 100.0 * busy / total)) if total > 0 else 0.0
+            all_busy += busy
+            all_total += total
+        cpu_total = min(100.0, max(0.0, 100.0 * all_busy / all_total)) if all_total > 0 else 0.0
+        state.sys_stats["cpu_total"] = cpu_total
+        
+        # Track how much the total moves between samples (drives adaptive refresh)
+        if state.cpu_ema is None:
+            state.cpu_ema = cpu_total
+        else:
+            diff = cpu_total - state.cpu_ema
+            state.cpu_ema += ADAPTIVE_EMA_ALPHA * diff
+            state.cpu_ema_var = (1.0 - ADAPTIVE_EMA_ALPHA) * (state.cpu_ema_var + ADAPTIVE_EMA_ALPHA * diff * diff)
+        state.cpu_ema_samples += 1
+        return True
     except:
-        pass
+        return False
+
+@ttl_cache(PARTITION_SCAN_INTERVAL)
+def _fixed_partitions():
+    """Mountpoints of the fixed drives."""
+    return [
+        part.mountpoint for part in psutil.disk_partitions(all=False)
+        if 'fixed' in part.opts.lower() or part.fstype
+    ]
+
+@ttl_cache(DISK_USAGE_INTERVAL)
+def _boot_disk_usage():
+    """Usage of the C: drive."""
+    return psutil.disk_usage('C:\\')
+
+@ttl_cache(DISK_USAGE_INTERVAL)
+def _all_disk_usage():
+    """(letter, usage) for every fixed drive that can be read."""
+    all_disks = []
+    for mountpoint in _fixed_partitions():
+        try:
+            letter = mountpoint.rstrip('\\')
+            usage = psutil.disk_usage(mountpoint)
+            all_disks.append((letter, usage))
+        except (PermissionError, OSError):
+            pass
+    return all_disks
 
 def update_system_stats_slow():
     """Update all system stats except CPU."""
@@ -218,7 +450,9 @@ def update_system_stats_slow():
     state.prev_time = now
     
     try:
-        state.sys_stats["mem"] = psutil.virtual_memory()
+        mem = psutil.virtual_memory()
+        state.sys_stats["mem"] = mem
+        state.mem_total = mem.total
     except:
         pass
     
@@ -227,24 +461,19 @@ def update_system_stats_slow():
     except:
         pass
     
+    # Drive identity (partition layout) and usage move slowly, so they are
+    # TTL-cached; only the I/O and network counters below are read every tick
     try:
-        state.sys_stats["disk_usage"] = psutil.disk_usage('C:\\')
+        state.sys_stats["disk_usage"] = _boot_disk_usage()
     except:
         pass
     
-    try:
-        all_disks = []
-        for part in psutil.disk_partitions(all=False):
-            if 'fixed' in part.opts.lower() or part.fstype:
-                try:
-                    letter = part.mountpoint.rstrip('\\')
-                    usage = psutil.disk_usage(part.mountpoint)
-                    all_disks.append((letter, usage))
-                except (PermissionError, OSError):
-                    pass
-        state.sys_stats["all_disks"] = all_disks
-    except:
-        pass
+    # Per-drive list is only shown with 'showdrives'
+    if state.show_all_drives:
+        try:
+            state.sys_stats["all_disks"] = _all_disk_usage()
+        except:
+            pass
     
     try:
         curr_disk = psutil.disk_io_counters()
@@ -264,9 +493,13 @@ def update_system_stats_slow():
     except:
         pass
 
-    state.sys_stats["smart"] = get_smart_status()
+    # Refreshed by the background poller; just read the cache here
+    state.sys_stats["smart"] = state.smart_cache[0]
     
-    gpu = get_gpu_info()
+    # Filled in by the background GPU poller; never fetch on the render path
+    gpu = state.gpu_cache[0]
+    if gpu is None:
+        return
     state.sys_stats["gpu_name"] = gpu["name"]
     state.sys_stats["gpu_util"] = gpu["util"]
     state.sys_stats["gpu_mem_used"] = gpu["mem_used"]
@@ -1,14 +1,20 @@
 """Input detection module"""
 import msvcrt
 import psutil
+import time
 from .state import state
 from .config import *
-from .processes import get_process_tree_info
-try:
-    from .audio_vis import AudioVisualizer, AUDIO_AVAILABLE
-except ImportError:
-    AUDIO_AVAILABLE = False
-    AudioVisualizer = None
+from .processes import get_process_tree_info, select_process_rows
+from .hardware import _all_disk_usage
+
+# Processes that must never be killed (lowercased names)
+_PROTECTED = frozenset({
+    "system", "registry", "memcompression", "secure system", "csrss.exe", "smss.exe",
+    "lsass.exe", "wininit.exe", "services.exe", "winlogon.exe", "svchost.exe", "dwm.exe",
+    "fontdrvhost.exe", "logonui.exe",
+})
+# Killable, but destabilizing enough to ask for confirmation first
+_WARN_PROTECTED = frozenset({"explorer.exe", "spoolsv.exe", "audiodg.exe"})
 
 def execute_pending_action():
     """Execute the pending confirmed action."""
@@ -18,15 +24,13 @@ def execute_pending_action():
     action, targets, original_arg = state.pending_confirmation
     state.pending_confirmation = None
     
-    protected = ["system", "registry", "memcompression", "secure system", "csrss.exe", "smss.exe", "lsass.exe", "wininit.exe", "services.exe", "winlogon.exe", "svchost.exe", "dwm.exe", "fontdrvhost.exe", "logonui.exe"]
-    
     success, errors = 0, 0
     
     for p in targets:
         try:
             pname = p.name().lower()
             
-            if action == "kill" and pname in protected:
+            if action == "kill" and pname in _PROTECTED:
                 state.status_message = f"BLOCKED: {p.name()} is critical to Windows"
                 errors += 1
                 continue
@@ -52,12 +56,16 @@ def execute_pending_action():
     action_names = {"kill": "Killed", "suspend": "Suspended", "resume": "Resumed"}
     state.status_message = f"{action_names[action]} {success}, Errors: {errors}"
 
+def _load_audio_visualizer():
+    """Import the visualizer on first use (it pulls in numpy/sounddevice); None if unavailable."""
+    try:
+        from .audio_vis import AudioVisualizer, AUDIO_AVAILABLE
+    except ImportError:
+        return None
+    return AudioVisualizer if AUDIO_AVAILABLE else None
+
 def handle_party_command():
     """Toggle party mode (audio visualizer easter egg)."""
-    if not AUDIO_AVAILABLE:
-        state.status_message = "Some people in this party are missing..."
-        return
-    
     if state.party_mode:
         state.party_mode = False
         if state.party_visualizer:
@@ -70,6 +78,10 @@ def handle_party_command():
         
         state.status_message = "Party's over... back to work!"
     else:
+        AudioVisualizer = _load_audio_visualizer()
+        if AudioVisualizer is None:
+            state.status_message = "Some people in this party are missing..."
+            return
         try:
             num_cores = len(state.sys_stats.get("cpu_per_core", [])) or psutil.cpu_count() or 8
             state.party_visualizer = AudioVisualizer(num_cpu_cores=num_cores)
@@ -86,87 +98,79 @@ def handle_party_command():
             state.party_visualizer = None
             state.status_message = "Some people in this party are missing..."
 
-def execute_command(cmd_str):
-    """Parse and execute a command."""
-    parts = cmd_str.strip().split(maxsplit=1)
-    if not parts:
-        return
-    
-    cmd = parts[0].lower()
-    arg = parts[1] if len(parts) > 1 else ""
-    
-    if cmd in ["quit", "exit", "q"]:
-        state.app_running = False
-        return
-    
-    if cmd == "party":
-        handle_party_command()
-        return
-    
-    if cmd == "help":
-        state.status_message = "kill|suspend|resume|info, sort, filter, speed, showdrives, export, quit"
-        return
-    
-    if cmd == "showdrives":
-        state.show_all_drives = not state.show_all_drives
-        if state.show_all_drives:
-            drive_count = len(state.sys_stats.get('all_disks', []))
-            state.status_message = f"Showing all drives ({drive_count} found)"
-        else:
-            state.status_message = "Showing only C: drive"
-        return
-    
-    if cmd == "speed":
-        speeds = [k for k in REFRESH_RATES.keys() if k != "party"]
-        key = arg.lower()
-        if key == "party":
-            state.status_message = "Not without music you dont."
-            return
-        if key in REFRESH_RATES:
-            state.current_refresh_rate = key
-            state.party_mode = False # this also deactivates party mode if using speed command instead of repeating party command
-            state.status_message = f"Refresh rate: {state.current_refresh_rate} ({REFRESH_RATES[state.current_refresh_rate]}s)"
-        else:
-            state.status_message = f"Usage: speed [{'/'.join(speeds)}]"
+def _cmd_quit(cmd, arg, arg_lower):
+    state.app_running = False
+
+def _cmd_party(cmd, arg, arg_lower):
+    handle_party_command()
+
+def _cmd_help(cmd, arg, arg_lower):
+    state.status_message = "kill|suspend|resume|info, sort, filter, speed, showdrives, export, quit"
+
+def _cmd_showdrives(cmd, arg, arg_lower):
+    state.show_all_drives = not state.show_all_drives
+    if state.show_all_drives:
+        # all_disks is only refreshed while shown, so fill it now to count it
+        all_disks = _all_disk_usage()
+        state.sys_stats['all_disks'] = all_disks
+        drive_count = len(all_disks)
+        state.status_message = f"Showing all drives ({drive_count} found)"
+    else:
+        state.status_message = "Showing only C: drive"
+
+def _cmd_speed(cmd, arg, arg_lower):
+    speeds = [k for k in REFRESH_RATES.keys() if k != "party"]
+    key = arg_lower
+    if key == "party":
+        state.status_message = "Not without music you dont."
         return
-    
-    if cmd == "sort":
-        col_map = {"pid": "pid", "cpu": "cpu_percent", "mem": "memory_percent", "name": "name"}
-        if arg.lower() in col_map:
-            new_key = col_map[arg.lower()]
-            if state.sort_key == new_key:
-                state.sort_desc = not state.sort_desc
-            else:
-                state.sort_key = new_key
-                state.sort_desc = True
-            state.scroll_offset = 0
-            state.status_message = f"Sorted by {arg} ({'desc' if state.sort_desc else 'asc'})"
+    if key in REFRESH_RATES:
+        state.current_refresh_rate = key
+        state.party_mode = False # this also deactivates party mode if using speed command instead of repeating party command
+        state.status_message = f"Refresh rate: {state.current_refresh_rate} ({REFRESH_RATES[state.current_refresh_rate]}s)"
+    else:
+        state.status_message = f"Usage: speed [{'/'.join(speeds)}]"
+
+_SORT_COLUMNS = {"pid": "pid", "cpu": "cpu_percent", "mem": "memory_percent", "name": "name"}
+
+def _cmd_sort(cmd, arg, arg_lower):
+    if arg_lower in _SORT_COLUMNS:
+        new_key = _SORT_COLUMNS[arg_lower]
+        if state.sort_key == new_key:
+            state.sort_desc = not state.sort_desc
         else:
-            state.status_message = "Usage: sort [pid|cpu|mem|name]"
-        return
-    
-    if cmd == "filter":
-        state.filter_text = arg
+            state.sort_key = new_key
+            state.sort_desc = True
         state.scroll_offset = 0
-        state.status_message = f"Filter: '{arg}'" if arg else "Filter cleared"
-        return
-    
-    if cmd == "export":
-        try:
-            filename = arg if arg else "processes.txt"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"PID\tNAME\tCPU%\tMEM%\tSTATUS\tUSER\n")
-                for p in state.processes:
-                    f.write(f"{p['pid']}\t{p['name']}\t{p['cpu_percent']:.1f}\t{p['memory_percent']:.1f}\t{p['status']}\t{p['username']}\n")
-            state.status_message = f"Exported to {filename}"
-        except Exception as e:
-            state.status_message = f"Export failed: {e}"
-        return
-    
-    if cmd not in ["kill", "suspend", "resume", "info"]:
-        state.status_message = f"Unknown: {cmd}"
-        return
-    
+        state.status_message = f"Sorted by {arg} ({'desc' if state.sort_desc else 'asc'})"
+    else:
+        state.status_message = "Usage: sort [pid|cpu|mem|name]"
+
+def _cmd_filter(cmd, arg, arg_lower):
+    state.filter_text = arg
+    state.filter_lower = arg_lower
+    state.scroll_offset = 0
+    state.status_message = f"Filter: '{arg}'" if arg else "Filter cleared"
+
+def _cmd_export(cmd, arg, arg_lower):
+    try:
+        filename = arg if arg else "processes.txt"
+        # The table only keeps the top rows; export all of them. Iterate our own
+        # list: the sampler may swap a trimmed one into state.processes meanwhile
+        rows = select_process_rows()
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(f"PID\tNAME\tCPU%\tMEM%\tSTATUS\tUSER\n")
+            for p in rows:
+                f.write(f"{p['pid']}\t{p['name']}\t{p['cpu_percent']:.1f}\t{p['memory_percent']:.1f}\t{p['status']}\t{p['username']}\n")
+        state.status_message = f"Exported to {filename}"
+    except Exception as e:
+        state.status_message = f"Export failed: {e}"
+
+def _cmd_unknown(cmd, arg, arg_lower):
+    state.status_message = f"Unknown: {cmd}"
+
+def _cmd_process_action(cmd, arg, arg_lower):
+    """kill / suspend / resume / info on a PID or name match."""
     if not arg:
         state.status_message = f"Usage: {cmd} <pid|name>"
         return
@@ -181,10 +185,11 @@ def execute_command(cmd_str):
             state.status_message = f"PID {arg} not found"
             return
     else:
-        for proc in psutil.process_iter(['pid', 'name']):
+        # process_iter already yields Process objects with the name prefetched
+        for proc in psutil.process_iter(['name']):
             try:
-                if arg.lower() in proc.info['name'].lower():
-                    targets.append(psutil.Process(proc.info['pid']))
+                if arg_lower in proc.info['name'].lower():
+                    targets.append(proc)
             except:
                 pass
     
@@ -195,24 +200,23 @@ def execute_command(cmd_str):
     if cmd == "info":
         p = targets[0]
         try:
-            info = f"{p.name()} PID:{p.pid} {p.status()} CPU:{p.cpu_percent():.1f}%"
-            try:
-                info += f" Exe:{p.exe()[:40]}"
-            except:
-                pass
+            # oneshot: name/status/cpu times share one query instead of one each
+            with p.oneshot():
+                info = f"{p.name()} PID:{p.pid} {p.status()} CPU:{p.cpu_percent():.1f}%"
+                try:
+                    info += f" Exe:{p.exe()[:40]}"
+                except:
+                    pass
             state.status_message = info
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             state.status_message = "Process info unavailable"
         return
     
-    protected = ["system", "registry", "memcompression", "secure system", "csrss.exe", "smss.exe", "lsass.exe", "wininit.exe", "services.exe", "winlogon.exe", "svchost.exe", "dwm.exe", "fontdrvhost.exe", "logonui.exe"]
-    warn_protected = ["explorer.exe", "spoolsv.exe", "audiodg.exe"]
-    
     warn_targets = []
     for p in targets:
         try:
             pname = p.name().lower()
-            if pname in warn_protected:
+            if pname in _WARN_PROTECTED:
                 warn_targets.append(p)
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             pass
@@ -236,7 +240,7 @@ def execute_command(cmd_str):
     for p in targets:
         try:
             pname = p.name().lower()
-            if cmd == "kill" and pname in protected:
+            if cmd == "kill" and pname in _PROTECTED:
                 state.status_message = f"Protected: {p.name()} (critical to Windows)"
                 errors += 1
                 continue
@@ -259,20 +263,57 @@ def execute_command(cmd_str):
     action_names = {"kill": "Killed", "suspend": "Suspended", "resume": "Resumed"}
     state.status_message = f"{action_names[cmd]} {success}, Errors: {errors}"
 
+# Command dispatch table: name -> handler(cmd, arg, arg_lower)
+COMMAND_HANDLERS = {
+    "quit": _cmd_quit,
+    "exit": _cmd_quit,
+    "q": _cmd_quit,
+    "party": _cmd_party,
+    "help": _cmd_help,
+    "showdrives": _cmd_showdrives,
+    "speed": _cmd_speed,
+    "sort": _cmd_sort,
+    "filter": _cmd_filter,
+    "export": _cmd_export,
+    "kill": _cmd_process_action,
+    "suspend": _cmd_process_action,
+    "resume": _cmd_process_action,
+    "info": _cmd_process_action,
+}
+
+def execute_command(cmd_str):
+    """Parse and execute a command."""
+    parts = cmd_str.strip().split(maxsplit=1)
+    if not parts:
+        return
+    
+    cmd = parts[0].lower()
+    arg = parts[1] if len(parts) > 1 else ""
+    COMMAND_HANDLERS.get(cmd, _cmd_unknown)(cmd, arg, arg.lower())
+    # Sort/filter/speed changes should show up without waiting a full interval
+    state.sampler_wake.set()
+
 def handle_input():
     """Handle keyboard input (non-blocking)."""
+    buf = state.input_buffer
     while msvcrt.kbhit():
         ch = msvcrt.getwch()
+        now_ns = time.monotonic_ns()
+        # First key after a quiet spell: the sampler may be in a stretched wait,
+        # so wake it to refresh at the nominal rate (not on every typed key)
+        if now_ns - state.last_input_ns >= INPUT_BOOST_SECONDS * 1_000_000_000:
+            state.sampler_wake.set()
+        state.last_input_ns = now_ns
         
         if state.pending_confirmation is not None:
             if ch.lower() == 'y':
                 execute_pending_action()
-                state.input_buffer = ""
+                buf.clear()
                 return
             elif ch.lower() == 'n' or ch == '\x1b':
                 state.pending_confirmation = None
                 state.status_message = "Action cancelled"
-                state.input_buffer = ""
+                buf.clear()
                 return
             else:
                 continue
@@ -291,21 +332,21 @@ def handle_input():
                 elif key2 == 'G': # Home
                     state.scroll_offset = 0
                 elif key2 == 'O': # End
-                    state.scroll_offset = max(0, len(state.processes) - 5)
-                elif key2 == 'S': # Del
-                    state.input_buffer = state.input_buffer[:-1]
+                    state.scroll_offset = max(0, state.process_count - 5)
+                elif key2 == 'S' and buf: # Del
+                    buf.pop()
             continue
         
         if ch == '\r':
-            execute_command(state.input_buffer)
-            state.input_buffer = ""
-        elif ch == '\b':
-            state.input_buffer = state.input_buffer[:-1]
-        elif ch == '\x7f':
-            state.input_buffer = state.input_buffer[:-1]
+            cmd_str = ''.join(buf)
+            buf.clear()
+            execute_command(cmd_str)
+        elif ch in ('\b', '\x7f'):
+            if buf:
+                buf.pop()
         elif ch == '\x1b':
-            state.input_buffer = ""
+            buf.clear()
         elif ch == '\x03':
             state.app_running = False
         elif ch.isprintable():
-            state.input_buffer += ch
+            buf.append(ch)
@@ -1,14 +1,52 @@
 """Process info/list module"""
+import functools
+import heapq
 import psutil
+import sys
 import time
 from .state import state
 from . import processsn
 
+# Rows kept beyond the visible window so small scrolls don't outrun the selection
+_TOPK_MARGIN = 16
+
+def get_psutil_process_snapshot():
+    """Build a ProcSnapshot like get_native_process_snapshot's using psutil.
+
+    Fallback for when the native query fails. Each process is read inside
+    oneshot() so psutil fetches the underlying data once per process rather
+    than once per attribute.
+    """
+    snap = processsn.ProcSnapshot()
+    for proc in psutil.process_iter():
+        try:
+            with proc.oneshot():
+                cpu_times = proc.cpu_times()
+                row = (
+                    proc.pid,
+                    proc.ppid(),
+                    sys.intern(proc.name()),
+                    proc.num_threads(),
+                    int((cpu_times.user + cpu_times.system) * 10_000_000),
+                    proc.memory_info().rss,
+                )
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        snap.pids.append(row[0])
+        snap.ppids.append(row[1])
+        snap.names.append(row[2])
+        snap.threads.append(row[3])
+        snap.cpu_times.append(row[4])
+        snap.rss.append(row[5])
+    return snap
+
 def get_processes():
     """Fetch and sort process list with accurate CPU% using native API."""
-    procs = []
     now = time.time()
-    num_cpus = psutil.cpu_count() or 1
+    # Constant for the session; cached on first use
+    if not state.num_cpus:
+        state.num_cpus = psutil.cpu_count() or 1
+    num_cpus = state.num_cpus
     
     # Initialize prev_proc_time if not set
     if not hasattr(state, 'prev_proc_time'):
@@ -17,116 +55,136 @@ def get_processes():
     interval = now - state.prev_proc_time
     state.prev_proc_time = now
 
-    # Get native snapshot
+    # Get native snapshot: one NtQuerySystemInformation call covers every PID
     try:
         snapshot = processsn.get_native_process_snapshot()
     except Exception as e:
-        print(f"Native snapshot failed: {e}")
-        import traceback
-        traceback.print_exc()
-        # Fallback if native fails (unlikely)
-        return
+        # Don't print over the TUI; report it and fall back to psutil
+        state.status_message = f"Native process snapshot failed: {e}"
+        snapshot = get_psutil_process_snapshot()
 
     # Compute CPU deltas (updates state.proc_cpu_cache in-place)
     # state.proc_cpu_cache must be a dict
     if not isinstance(state.proc_cpu_cache, dict):
         state.proc_cpu_cache = {}
         
-    proc_list = processsn.compute_cpu_deltas(state.proc_cpu_cache, snapshot, interval, num_cpus)
+    snap_cpus = processsn.compute_cpu_deltas(state.proc_cpu_cache, snapshot, interval, num_cpus)
     
-    # Get memory total for % calc
-    try:
-        mem_total = psutil.virtual_memory().total
-    except:
-        mem_total = 0
+    # Get memory total for % calc (kept fresh by update_system_stats_slow)
+    if not state.mem_total:
+        try:
+            state.mem_total = psutil.virtual_memory().total
+        except:
+            pass
+    mem_scale = 100.0 / state.mem_total if state.mem_total > 0 else 0.0
 
-    # Process list into UI format
-    for p in proc_list:
-        pid = p['pid']
+    # Select the displayed columns (struct-of-arrays) so sorting only touches
+    # the one column it orders by
+    pids, names, cpus, mems = [], [], [], []
+    filter_lower = state.filter_lower
+    lower_cache = state.name_lower_cache
+    for pid, name, cpu, rss in zip(snapshot.pids, snapshot.names, snap_cpus, snapshot.rss):
         if pid == 0: continue # Idle process
-
-        # Calculate memory percent
-        rss = p.get('rss_bytes', 0)
-        mem_pct = (rss / mem_total * 100) if mem_total > 0 else 0.0
         
-        # Apply filter
-        name = p.get('name', '').lower()
-        if state.filter_text and state.filter_text.lower() not in name:
-            continue
-            
-        # Add to display list
-        # Status and Username are expensive to fetch per-process, so we skip or cache?
-        # For now, to meet "faster process calling" goal, we leave them simple or optional.
-        # If we really need them, we could use psutil.Process(pid) but that defeats the optimization.
-        # We'll use '?' to indicate optimized mode lacking this detail, or maybe cache it later.
+        # Apply filter (filter is lowercased once when set, names once per distinct name)
+        if filter_lower:
+            name_lower = lower_cache.get(name)
+            if name_lower is None:
+                name_lower = lower_cache[name] = name.lower()
+            if filter_lower not in name_lower:
+                continue
         
-        pinfo = {
-            'pid': pid,
-            'name': p['name'],
-            'cpu_percent': p['cpu_percent'],
-            'memory_percent': mem_pct,
+        pids.append(pid)
+        names.append(name)
+        cpus.append(cpu)
+        mems.append(rss * mem_scale)
+    
+    state.proc_columns = (pids, names, cpus, mems)
+    state.process_count = len(pids)
+    select_process_rows(state.scroll_offset + state.visible_rows + _TOPK_MARGIN)
+
+def select_process_rows(limit=None):
+    """Build state.processes from the last refresh's columns, sorted by state.sort_key.
+
+    Only the first `limit` rows are selected (heapq, O(N log K)) since the table
+    never shows more than that; None selects and fully sorts every row.
+    Returns the new row list (the sampler thread may replace state.processes).
+    """
+    pids, names, cpus, mems = state.proc_columns
+    n = len(pids)
+    
+    # Order row indices by a single column; the key is a C-level list lookup
+    if state.sort_key == 'name':
+        lower_cache = state.name_lower_cache
+        sort_col = [lower_cache.get(nm) or lower_cache.setdefault(nm, nm.lower()) for nm in names]
+    else:
+        sort_col = {'pid': pids, 'cpu_percent': cpus, 'memory_percent': mems}.get(state.sort_key, cpus)
+    key = sort_col.__getitem__
+    if limit is None or limit >= n:
+        order = sorted(range(n), key=key, reverse=state.sort_desc)
+    elif state.sort_desc:
+        order = heapq.nlargest(limit, range(n), key=key)
+    else:
+        order = heapq.nsmallest(limit, range(n), key=key)
+    
+    # Status and Username are expensive to fetch per-process (one handle each),
+    # so the native path leaves them as placeholders
+    rows = [
+        {
+            'pid': pids[i],
+            'name': names[i],
+            'cpu_percent': cpus[i],
+            'memory_percent': mems[i],
             'status': 'Running', # assume running
             'username': '?'
         }
-        
-        procs.append(pinfo)
-    
-    # Sort
+        for i in order
+    ]
+    state.processes = rows
+    return rows
+
+@functools.lru_cache(maxsize=256)
+def _cached_process_name(pid, create_time):
+    """Name of one process instance; keyed by create time too, since Windows reuses PIDs quickly."""
+    return psutil.Process(pid).name()
+
+def _get_process_name(pid):
+    """Name of a PID not in the current process list. Failures aren't cached, so they're retried next time."""
     try:
-        if state.sort_key == 'name':
-            state.processes = sorted(procs, key=lambda p: (p.get(state.sort_key) or '').lower(), reverse=state.sort_desc)
-        else:
-            state.processes = sorted(procs, key=lambda p: p.get(state.sort_key, 0) or 0, reverse=state.sort_desc)
-    except:
-        state.processes = procs
+        return _cached_process_name(pid, psutil.Process(pid).create_time())
+    except Exception:
+        return "unknown"
 
 def get_process_tree_info(targets):
-    """Build process tree info showing parent-child relationships."""
+    """Build process tree info showing parent-child relationships.
+
+    targets may hold psutil.Process objects (from the kill/suspend commands) or
+    process dicts (as in state.processes).
+    """
     tree_lines = []
-    parent_groups = {}  # parent_pid -> list of child processes
-    
-    # Recalculate full list for tree building if needed, or search current state.processes?
-    # get_process_tree_info takes 'targets' which are psutil.Process objects usually...
-    # Wait, 'targets' in ui.py or input.py might be passed as PID or dict?
-    # In pending_confirmation, targets is list of dicts or objects.
-    # We need to verify what 'targets' contains.
-    # Since we replaced get_processes, state.processes now contains dicts, not psutil.Process objects.
-    # Previous code: procs.append(pinfo) -> pinfo was dict (proc.info.copy()).
-    # So targets is list of dicts.
-    
-    # However, get_process_tree_info implementation in original used p.ppid() which implies p is psutil.Process?
-    # Let's check the original code again.
-    # "for p in targets: try: ppid = p.ppid() ..."
-    # "procs.append(pinfo)" where pinfo is dict.
-    # Ah, the `targets` passed to `get_process_tree_info` might come from `state.pending_confirmation`? 
-    # Let's assume we need to handle dicts now, or re-instantiate psutil objects.
-    # The user asked for "Displaying the entire process tree...".
-    
-    # If targets contains dicts from our new get_processes, they have 'pid' and 'ppid' (we added ppid in processsn return).
-    # processsn.compute_cpu_deltas returns list of dicts WITH 'ppid'.
-    # So we can use that.
+    parent_groups = {}  # parent_pid -> list of child pids
     
     for p in targets:
-        # p is dict
         try:
-            pid = p['pid']
-            ppid = p.get('ppid', 0)
-            
-            if ppid not in parent_groups:
-                parent_groups[ppid] = []
-            parent_groups[ppid].append(p)
-        except:
+            if isinstance(p, dict):
+                pid = p['pid']
+                ppid = p.get('ppid', 0)
+            else:
+                pid = p.pid
+                ppid = p.ppid()
+            parent_groups.setdefault(ppid, []).append(pid)
+        except Exception:
             pass
             
-    # We need to look up parent names.
-    # We can use state.processes to find names of parents!
-    # Map pid -> name
-    proc_map = {proc['pid']: proc['name'] for proc in state.processes}
+    # Look up parent names from the current process list (built once), only
+    # falling back to psutil for parents that aren't in it
+    pids, names = state.proc_columns[0], state.proc_columns[1]
+    proc_map = dict(zip(pids, names))
 
     for ppid, children in parent_groups.items():
-        parent_name = proc_map.get(ppid, "unknown")
+        parent_name = proc_map.get(ppid) or _get_process_name(ppid)
         
-        for child in children:
-            tree_lines.append(f"  PID {child['pid']} (parent: {ppid} {parent_name})")
+        for child_pid in children:
+            tree_lines.append(f"  PID {child_pid} (parent: {ppid} {parent_name})")
     
     return tree_lines
@@ -1,11 +1,18 @@
 """Process info/list module using native windows APIs"""
 import ctypes
 import ctypes.wintypes as wt
+import struct
+import sys
 
 # Windows types for NtQuerySystemInformation
 ntdll = ctypes.WinDLL("ntdll")
 
 SystemProcessInformation = 5
+STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+
+# Snapshot buffer reused across calls (grown on STATUS_INFO_LENGTH_MISMATCH)
+_snap_buf = None
+_snap_buf_size = 1_000_000
 
 class UNICODE_STRING(ctypes.Structure):
     _fields_ = [
@@ -68,9 +75,72 @@ class SYSTEM_PROCESS_INFORMATION(ctypes.Structure):
         # Followed in memory by SYSTEM_THREAD_INFORMATION array
     ]
 
+def _entry_struct():
+    """
+    Build one struct.Struct reading every field the snapshot needs from a
+    SYSTEM_PROCESS_INFORMATION entry, with pad bytes between them. Offsets come
+    from the ctypes layout above, so a single unpack_from per entry replaces the
+    ctypes wrapper objects (cast/contents/field access) per process.
+    """
+    ptr = "Q" if ctypes.sizeof(ctypes.c_void_p) == 8 else "I"
+    spi = SYSTEM_PROCESS_INFORMATION
+    image = spi.ImageName.offset
+    fields = [
+        (spi.NextEntryOffset.offset, "I"),
+        (spi.NumberOfThreads.offset, "I"),
+        (spi.CreateTime.offset, "q"),
+        (spi.UserTime.offset, "q"),
+        (spi.KernelTime.offset, "q"),
+        (image + UNICODE_STRING.Length.offset, "H"),
+        (image + UNICODE_STRING.Buffer.offset, ptr),
+        (spi.UniqueProcessId.offset, ptr),
+        (spi.InheritedFromUniqueProcessId.offset, ptr),
+        (spi.WorkingSetSize.offset, ptr),
+    ]
+    fmt, pos = "<", 0
+    for offset, code in fields:
+        if offset > pos:
+            fmt += f"{offset - pos}x"
+        fmt += code
+        pos = offset + struct.calcsize("<" + code)
+    return struct.Struct(fmt)
+
+# (next, threads, create, user, kernel, name_len, name_ptr, pid, ppid, wss) per entry
+_ENTRY = _entry_struct()
+
+# pid -> (CreateTime, interned name). A PID's name never changes while it lives,
+# and CreateTime tells a reused PID apart, so names are decoded once per process
+_name_cache = {}
+
+class ProcSnapshot:
+    """
+    Column-wise (struct-of-arrays) process snapshot: one list per field, where
+    index i across all lists describes the same process.
+
+    Fields:
+        pids (list[int])
+        ppids (list[int])
+        names (list[str])
+        threads (list[int])
+        cpu_times (list[int]): user + kernel time in 100 nanosecond units
+        rss (list[int]): working set in bytes
+    """
+    __slots__ = ("pids", "ppids", "names", "threads", "cpu_times", "rss")
+
+    def __init__(self):
+        self.pids = []
+        self.ppids = []
+        self.names = []
+        self.threads = []
+        self.cpu_times = []
+        self.rss = []
+
+    def __len__(self):
+        return len(self.pids)
+
 def get_native_process_snapshot():
     """
-    Returns a list of process records using a single native Windows kernel query.
+    Returns a snapshot of all processes using a single native Windows kernel query.
 
     This function performs ONE call to NtQuerySystemInformation with
     SystemProcessInformation and parses the resulting process list.
@@ -79,36 +149,32 @@ def get_native_process_snapshot():
         None
 
     Returns:
-        list[dict] where each dict contains:
-            pid (int)
-            ppid (int)
-            name (str)
-            threads (int)
-            user_time_100ns (int)
-            kernel_time_100ns (int)
-            rss_bytes (int)
+        ProcSnapshot with one column per field (no per-process dicts)
 
     Notes:
         CPU is NOT a percent here. It must be computed using deltas across snapshots (done in processes.py, but this contains a helper).
         Time values are in 100 nanosecond units, straight from Windows.
     """
 
-    # First call allocates a buffer guess
-    buf_size = 1_000_000
+    global _snap_buf, _snap_buf_size
+
+    # The buffer is kept across calls and only regrown when it is too small.
+    # No zeroing needed: the kernel overwrites what it reports and the walk
+    # stops at the entry whose NextEntryOffset is 0.
     while True:
-        buf = ctypes.create_string_buffer(buf_size)
+        if _snap_buf is None:
+            _snap_buf = ctypes.create_string_buffer(_snap_buf_size)
         ret = ntdll.NtQuerySystemInformation(
             SystemProcessInformation,
-            buf,
-            buf_size,
+            _snap_buf,
+            _snap_buf_size,
             None
         )
 
-        STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
-
         if ret == STATUS_INFO_LENGTH_MISMATCH:
             # buffer too small, grow it
-            buf_size *= 2
+            _snap_buf_size *= 2
+            _snap_buf = None
             continue
 
         if ret != 0:
@@ -116,36 +182,46 @@ def get_native_process_snapshot():
 
         break
 
-    results = []
+    buf = _snap_buf
+    snap = ProcSnapshot()
+    # Bound appends: one attribute lookup per column instead of per process
+    pids, ppids, names = snap.pids.append, snap.ppids.append, snap.names.append
+    threads, cpu_times, rss = snap.threads.append, snap.cpu_times.append, snap.rss.append
+    unpack_from = _ENTRY.unpack_from
+    wstring_at = ctypes.wstring_at
+    name_cache = _name_cache
     offset = 0
 
     while True:
-        entry = ctypes.cast(
-            ctypes.addressof(buf) + offset,
-            ctypes.POINTER(SYSTEM_PROCESS_INFORMATION)
-        ).contents
-
-        pid = ctypes.cast(entry.UniqueProcessId, ctypes.c_void_p).value or 0
-        ppid = ctypes.cast(entry.InheritedFromUniqueProcessId, ctypes.c_void_p).value or 0
-
-        name = entry.ImageName.Buffer if entry.ImageName.Buffer else "System"
-
-        results.append({
-            "pid": pid,
-            "ppid": ppid,
-            "name": name,
-            "threads": entry.NumberOfThreads,
-            "user_time_100ns": entry.UserTime,
-            "kernel_time_100ns": entry.KernelTime,
-            "rss_bytes": entry.WorkingSetSize,
-        })
-
-        if entry.NextEntryOffset == 0:
+        (next_offset, num_threads, create_time, user_time, kernel_time,
+         name_len, name_ptr, pid, ppid, wss) = unpack_from(buf, offset)
+
+        pids(pid)
+        ppids(ppid)
+        cached = name_cache.get(pid)
+        if cached is not None and cached[0] == create_time:
+            name = cached[1]
+        else:
+            # ImageName.Length is in bytes; the buffer points into `buf` itself.
+            # Interned so svchost.exe x80 shares one str (and compares by identity)
+            name = sys.intern(wstring_at(name_ptr, name_len // 2)) if name_ptr else "System"
+            name_cache[pid] = (create_time, name)
+        names(name)
+        threads(num_threads)
+        cpu_times(user_time + kernel_time)
+        rss(wss)
+
+        if next_offset == 0:
             break
 
-        offset += entry.NextEntryOffset
+        offset += next_offset
 
-    return results
+    # Every live PID was just touched, so only a bigger cache means some exited
+    if len(name_cache) > len(snap.pids):
+        for pid in name_cache.keys() - set(snap.pids):
+            del name_cache[pid]
+
+    return snap
 
 def compute_cpu_deltas(prev_cache, curr_snapshot, interval_seconds, cpu_count):
     """
@@ -153,12 +229,13 @@ def compute_cpu_deltas(prev_cache, curr_snapshot, interval_seconds, cpu_count):
 
     Inputs:
         prev_cache:
-            dict[int, dict]
-            The EXISTING cache map of pid -> record. Will be updated in-place.
+            dict[int, int]
+            The EXISTING cache map of pid -> total (user + kernel) CPU time in
+            100ns units from the previous snapshot. Will be updated in-place.
 
         curr_snapshot:
-            list[dict]
-            A fresh list from get_native_process_snapshot
+            ProcSnapshot
+            A fresh snapshot from get_native_process_snapshot
 
         interval_seconds:
             float
@@ -169,55 +246,31 @@ def compute_cpu_deltas(prev_cache, curr_snapshot, interval_seconds, cpu_count):
             Number of logical CPUs for normalization
 
     Returns:
-        list[dict]:
-            proc_list with computed stats
+        list[float]:
+            CPU percent per process, in the same row order as curr_snapshot
     """
-    results = []
-
     # Clamp interval to avoid division by zero or noisy spikes on very fast updates
     if interval_seconds < 0.05:
         interval_seconds = 0.05
 
-    # Track which pids we see in this snapshot to evict dead ones later
-    seen_pids = set()
-
-    for proc in curr_snapshot:
-        pid = proc["pid"]
-        seen_pids.add(pid)
-
-        prev = prev_cache.get(pid)
-
-        total_time_now = proc["user_time_100ns"] + proc["kernel_time_100ns"]
-
-        if prev:
-            total_time_prev = prev["user_time_100ns"] + prev["kernel_time_100ns"]
-            dt_100ns = max(0, total_time_now - total_time_prev)
+    # 100ns ticks -> percent of all CPUs over the interval, folded into one factor
+    scale = 100.0 / (interval_seconds * 10_000_000.0 * max(1, cpu_count))
 
-            # convert 100ns units to seconds
-            dt_seconds = dt_100ns / 10_000_000.0
+    pids = curr_snapshot.pids
+    totals = curr_snapshot.cpu_times
 
-            cpu = (dt_seconds / interval_seconds) * 100 / max(1, cpu_count)
-        else:
-            cpu = 0.0
-
-        cpu = max(0.0, min(cpu, 100.0))
-
-        results.append({
-            "pid": pid,
-            "ppid": proc["ppid"],
-            "name": proc["name"],
-            "threads": proc["threads"],
-            "cpu_percent": cpu,
-            "rss_bytes": proc["rss_bytes"],
-        })
-
-        # Update cache in-place
-        prev_cache[pid] = proc
+    # Whole-column passes driven by C builtins (map/zip/dict.update) instead of
+    # a per-process loop body. A PID missing from the cache defaults to its own
+    # current total, i.e. a zero delta on its first sample.
+    prev_totals = map(prev_cache.get, pids, totals)
+    cpus = [
+        d if 0.0 <= d <= 100.0 else (0.0 if d < 0.0 else 100.0)
+        for d in [(now - prev) * scale for now, prev in zip(totals, prev_totals)]
+    ]
 
-    # Evict dead pids
-    # We do this by checking keys in prev_cache that are NOT in seen_pids
-    dead_pids = [pid for pid in prev_cache if pid not in seen_pids]
-    for pid in dead_pids:
-        del prev_cache[pid]
+    # Rebuild the cache in place from the current columns; this also drops
+    # exited PIDs without a separate set difference
+    prev_cache.clear()
+    prev_cache.update(zip(pids, totals))
 
-    return results
+    return cpus
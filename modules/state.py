@@ -1,9 +1,10 @@
 """Global state container"""
+import threading
 
 class AppState:
     def __init__(self):
         self.app_running = True
-        self.input_buffer = ""
+        self.input_buffer = []  # typed command chars; joined only on Enter/render
         self.status_message = "Type 'help' for commands. Use ↑↓ to scroll."
         
         # Display settings
@@ -11,11 +12,15 @@ class AppState:
         self.sort_desc = True
         self.scroll_offset = 0
         self.filter_text = ""
+        self.filter_lower = ""  # filter_text.lower(), computed when the filter is set
         self.show_all_drives = False
         self.current_refresh_rate = "medium"
         
         # Data
-        self.processes = []
+        self.processes = []      # sorted rows; only the top ones the table can reach
+        self.process_count = 0   # number of processes passing the filter
+        self.proc_columns = ([], [], [], [])  # last refresh's (pids, names, cpus, mems)
+        self.visible_rows = 40   # process table height, updated by the renderer
         self.sys_stats = {
             "cpu_total": 0.0,
             "cpu_per_core": [],
@@ -42,11 +47,31 @@ class AppState:
         self.prev_net = None
         self.prev_disk = None
         self.prev_time = 0
+        self.prev_cpu_times = None  # last psutil.cpu_times(percpu=True) sample
+        self.last_cpu_sample = 0    # time.monotonic() when prev_cpu_times was taken
+        self.cpu_ema = None         # EMA of total CPU% (adaptive refresh)
+        self.cpu_ema_var = 0.0      # EMA variance of total CPU%
+        self.cpu_ema_samples = 0    # samples fed into the EMA so far
+        self.last_input_ns = 0      # time.monotonic_ns() of the last keypress
+        self.console_minimized = False  # console window minimized: skip sampling/drawing
         self.smart_cache = ("Checking...", 0)
         self.gpu_cache = (None, 0)
+        self.nvml_checked = False  # NVML init attempted yet?
+        self.nvml_handle = None    # cached handle of GPU 0 (None = no NVIDIA/NVML)
+        self.gpu_probe_backoff = {}  # method -> (fail_count, next_retry_time)
+        self.gpu_poller = None       # background thread refreshing gpu_cache
+        self.sampler = None          # background thread refreshing slow stats + processes
+        self.sampler_wake = threading.Event()  # set to make the sampler refresh now
+        self.gpu_static = None       # (name, vram_bytes) from WMI, fetched once
+        self.ps_proc = None          # persistent PowerShell used for WMI/SMART queries
+        self.ps_lines = None         # queue of its stdout lines (fed by a reader thread)
         self.prev_term_size = (0, 0)
+        self.prev_lines = []      # rows drawn last frame, for diff rendering
         self.hw_info_fetched = False
-        self.proc_cpu_cache = {}  # pid -> (last_cpu_times, last_time)
+        self.proc_cpu_cache = {}  # pid -> last total CPU time (100ns units)
+        self.num_cpus = 0         # logical CPU count, cached on first use
+        self.mem_total = 0        # total RAM in bytes, refreshed with the slow stats
+        self.name_lower_cache = {}  # process name -> lowercased name
         
         # Confirmation workflow
         self.pending_confirmation = None # (action, targets, original_arg)
@@ -1,20 +1,86 @@
 """UI rendering module"""
+import math
+import os
 import sys
 from .state import state
 from .config import *
 from .utils import get_terminal_size, draw_bar, format_bytes
+from .processes import select_process_rows
+
+# Fixed row labels, formatted once instead of per frame
+_CPU_PREFIXES = tuple(f"CPU{i:<2}" for i in range(256))
+_LBL_TOTAL = f"{C_BOLD}Total{C_RESET} "
+_LBL_MEM = "Mem   "
+_LBL_PAGE = "Page  "
+_LBL_DISK_C = "C:    "
+_LBL_GPU = "GPU   "
+
+# Usage bar color by percent rounded up: green up to 70, yellow to 90, red
+# above (ceil keeps exactly 70/90 in the lower band, as with > 70 / > 90)
+_COLOR_LUT = (C_GREEN,) * 71 + (C_YELLOW,) * 20 + (C_RED,) * 10
+
+_stdout_fd = None
+
+# Frames are assembled into this one buffer at a running offset. It never
+# shrinks, and same-length slice assignment copies in place, so a frame costs
+# no allocation (bytearray += / clear() would realloc as it grows and shrinks)
+_frame_buf = bytearray(64 * 1024)
+
+def _frame_put(pos, chunk):
+    """Copy chunk into the frame buffer at pos, growing it if needed. Returns the new end offset."""
+    end = pos + len(chunk)
+    if end > len(_frame_buf):
+        _frame_buf.extend(bytes(max(end, 2 * len(_frame_buf)) - len(_frame_buf)))
+    _frame_buf[pos:end] = chunk
+    return end
+
+def _write_frame(size):
+    """Write the first size bytes of the frame buffer straight to the stdout fd, skipping the text layer's encode/lock/flush."""
+    global _stdout_fd
+    if _stdout_fd is None:
+        sys.stdout.flush()  # anything still queued in the text layer goes first
+        _stdout_fd = sys.stdout.fileno()
+    # Views are released on exit: an exported buffer can't be grown next frame
+    with memoryview(_frame_buf) as view:
+        pos = 0
+        while pos < size:
+            with view[pos:size] as rest:
+                pos += os.write(_stdout_fd, rest)
+
+def frame_key():
+    """
+    Everything render() reads, as one comparable tuple: if it equals the
+    previous frame's key the frame would come out identical and can be skipped.
+    """
+    stats = state.sys_stats
+    return (
+        get_terminal_size(),
+        tuple(stats.values()),
+        tuple(stats["cpu_per_core"]),  # updated in place, so compare a copy
+        state.processes, state.process_count, state.scroll_offset,
+        tuple(state.input_buffer), state.status_message, state.filter_text,
+        state.sort_key, state.sort_desc, state.current_refresh_rate,
+        state.show_all_drives,
+    )
 
 def render():
     """Render the entire UI."""
     cols, rows = get_terminal_size()
     
+    # The whole frame is assembled as UTF-8 bytes and written in one call;
+    # out_len is its length so far in _frame_buf
+    out_len = 0
+    
     # Detect terminal resize
     if (cols, rows) != state.prev_term_size:
-        sys.stdout.write("\033[2J")
+        out_len = _frame_put(out_len, CLEAR_SCREEN_B)
         state.prev_term_size = (cols, rows)
+        state.prev_lines = []  # screen was cleared: redraw every row
     
     # Validation for extremely small windows to prevent crash
     if cols < 79 or rows < 18:
+        if out_len:
+            _write_frame(out_len)
         return
     
     # We build the buffer line by line.
@@ -37,7 +103,7 @@ def render():
     
     # --- Command Bar ---
     speed_indicator = f"[{state.current_refresh_rate}]"
-    cmd_display = f" > {state.input_buffer}"
+    cmd_display = " > " + "".join(state.input_buffer)
     vis_len = len(cmd_display) + len(speed_indicator) + 1 
     padding = max(0, cols - vis_len)
     
@@ -59,12 +125,12 @@ def render():
     if state.party_mode and state.party_visualizer:
         party_mags = state.party_visualizer.get_magnitudes()
     
-    # CPU bars: 3 per row
-    cores_per_row = 3
+    # CPU bars: CORES_PER_ROW per row
+    cores_per_row = CORES_PER_ROW
     # Labels+Val per core ~ 6 + 8 = 14
     # Total overhead ~ 14*3 = 42. buffer ~3 -> 45
     max_width_total = (cols - 45) // cores_per_row
-    bar_width = max(3, min(25, max_width_total))
+    bar_width = max(3, min(MAX_CORE_BAR_WIDTH, max_width_total))
     
     row_str = ""
     for i, usage in enumerate(cpu_cores):
@@ -81,11 +147,10 @@ def render():
         if party_mags and i < len(party_mags['cpu']):
             usage = party_mags['cpu'][i]
         
-        color = C_GREEN
-        if usage > 70: color = C_YELLOW
-        if usage > 90: color = C_RED
+        color = _COLOR_LUT[min(math.ceil(usage), 100)]
         
-        row_str += f"CPU{i:<2}{draw_bar(usage, bar_width, color)}{usage:5.1f}%  "
+        prefix = _CPU_PREFIXES[i] if i < 256 else f"CPU{i:<2}"
+        row_str += f"{prefix}{draw_bar(usage, bar_width, color)}{usage:5.1f}%  "
     
     if row_str:
         sys_mon_lines.append(row_str + "\033[K")
@@ -94,9 +159,7 @@ def render():
     total_cpu = state.sys_stats.get("cpu_total", 0)
     if party_mags:
         total_cpu = sum(party_mags['cpu']) / len(party_mags['cpu']) if party_mags['cpu'] else 0
-    total_color = C_GREEN
-    if total_cpu > 70: total_color = C_YELLOW
-    if total_cpu > 90: total_color = C_RED
+    total_color = _COLOR_LUT[min(math.ceil(total_cpu), 100)]
     
     # Main Bars calculation
     # "Label " (6) + [bar] (w+2) + " " (1) + "100.0%" (6) + "  " (2) + "xxx GB / xxx GB" (25ish)
@@ -104,19 +167,19 @@ def render():
     # Safe conservative: cols - 50.
     main_bar_width = max(3, cols - 50)
     
-    sys_mon_lines.append(f"{C_BOLD}Total{C_RESET} {draw_bar(total_cpu, main_bar_width, total_color)} {total_cpu:5.1f}%\033[K")
+    sys_mon_lines.append(f"{_LBL_TOTAL}{draw_bar(total_cpu, main_bar_width, total_color)} {total_cpu:5.1f}%\033[K")
     
     if mem:
         mem_pct = party_mags['ram'] if party_mags else mem.percent
-        sys_mon_lines.append(f"Mem   {draw_bar(mem_pct, main_bar_width, C_CYAN)} {mem_pct:5.1f}%  {format_bytes(mem.used, '')} / {format_bytes(mem.total, '')}\033[K")
+        sys_mon_lines.append(f"{_LBL_MEM}{draw_bar(mem_pct, main_bar_width, C_CYAN)} {mem_pct:5.1f}%  {format_bytes(mem.used, '')} / {format_bytes(mem.total, '')}\033[K")
     
     if swap:
         swap_pct = party_mags['swap'] if party_mags else swap.percent
-        sys_mon_lines.append(f"Page  {draw_bar(swap_pct, main_bar_width, C_MAGENTA)} {swap_pct:5.1f}%  {format_bytes(swap.used, '')} / {format_bytes(swap.total, '')}\033[K")
+        sys_mon_lines.append(f"{_LBL_PAGE}{draw_bar(swap_pct, main_bar_width, C_MAGENTA)} {swap_pct:5.1f}%  {format_bytes(swap.used, '')} / {format_bytes(swap.total, '')}\033[K")
     
     if disk:
         disk_pct = party_mags['disk'] if party_mags else disk.percent
-        sys_mon_lines.append(f"C:    {draw_bar(disk_pct, main_bar_width, C_BLUE)} {disk_pct:5.1f}%  SMART: {state.sys_stats.get('smart', '?')}\033[K")
+        sys_mon_lines.append(f"{_LBL_DISK_C}{draw_bar(disk_pct, main_bar_width, C_BLUE)} {disk_pct:5.1f}%  SMART: {state.sys_stats.get('smart', '?')}\033[K")
         
     if state.show_all_drives:
         all_disks = state.sys_stats.get("all_disks", [])
@@ -127,18 +190,16 @@ def render():
     if state.sys_stats.get("gpu_available"):
         is_igpu = state.sys_stats.get("gpu_is_igpu", False)
         if is_igpu:
-            gpu_line = f"GPU   {C_DIM}[iGPU]{C_RESET} {state.sys_stats.get('gpu_name', 'Unknown')[:30]}  {C_CYAN}(Shared Memory){C_RESET}"
+            gpu_line = f"{_LBL_GPU}{C_DIM}[iGPU]{C_RESET} {state.sys_stats.get('gpu_name', 'Unknown')[:30]}  {C_CYAN}(Shared Memory){C_RESET}"
         else:
             gpu_util = state.sys_stats.get("gpu_util", 0)
-            gpu_color = C_GREEN
-            if gpu_util > 70: gpu_color = C_YELLOW
-            if gpu_util > 90: gpu_color = C_RED
+            gpu_color = _COLOR_LUT[min(math.ceil(gpu_util), 100)]
             
             # Additional GPU VRAM text ~ 30 chars?
             # "  VRAM: 12.0 GB / 24.0 GB (50%)" -> 30 chars.
             # Label(6) + Bar(w+2) + Pct(6) + 30 = w + 44.
             # Use main_bar_width (cols-50) is safe.
-            gpu_line = f"GPU   {draw_bar(gpu_util, main_bar_width, gpu_color)} {gpu_util:5.1f}%"
+            gpu_line = f"{_LBL_GPU}{draw_bar(gpu_util, main_bar_width, gpu_color)} {gpu_util:5.1f}%"
             
             gpu_mem_total = state.sys_stats.get("gpu_mem_total", 0)
             gpu_mem_used = state.sys_stats.get("gpu_mem_used", 0)
@@ -168,9 +229,14 @@ def render():
     used_height = len(lines) + 2 # +1 header, +1 status
     max_proc_rows = max(1, rows - used_height - 1) # -1 safety
     
-    max_scroll = max(0, len(state.processes) - max_proc_rows)
+    state.visible_rows = max_proc_rows
+    max_scroll = max(0, state.process_count - max_proc_rows)
     state.scroll_offset = max(0, min(state.scroll_offset, max_scroll))
     
+    # Scrolled past the rows selected at the last refresh: extend the selection
+    if len(state.processes) < min(state.scroll_offset + max_proc_rows, state.process_count):
+        select_process_rows(state.scroll_offset + max_proc_rows + 16)
+    
     sort_ind = {"pid": "", "name": "", "cpu_percent": "", "memory_percent": ""}
     if state.sort_key in sort_ind:
         sort_ind[state.sort_key] = "▼" if state.sort_desc else "▲"
@@ -202,7 +268,7 @@ def render():
     lines.append(f"{C_DIM}{'─' * cols}{C_RESET}\033[K")
     
     # Status
-    scroll_info = f"[{state.scroll_offset + 1}-{min(state.scroll_offset + max_proc_rows, len(state.processes))}/{len(state.processes)}]"
+    scroll_info = f"[{state.scroll_offset + 1}-{min(state.scroll_offset + max_proc_rows, state.process_count)}/{state.process_count}]"
     filter_info = f" Filter:'{state.filter_text}'" if state.filter_text else ""
     status_msg = state.status_message
     if len(status_msg) > cols - 30: status_msg = status_msg[:cols-30] + "..."
@@ -210,14 +276,22 @@ def render():
     
     lines.append(status_line + "\033[K")
     
-    # Truncate strictly to rows-1 to prevent scroll
-    # We want to print at 0,0.
-    sys.stdout.write("\033[H")
-    # Join with newlines
     # Truncate to rows to prevent scroll, height math is handled above.
     # and also :rows-1 deletes the status bar.
     final_output = lines[:rows]
     
-    sys.stdout.write("\n".join(final_output))
-    sys.stdout.write("\033[J") # Clear remaining bottom
-    sys.stdout.flush()
+    # Only rewrite rows that differ from what is already on screen
+    prev_lines = state.prev_lines
+    n_prev = len(prev_lines)
+    for i, line in enumerate(final_output):
+        if i >= n_prev or prev_lines[i] != line:
+            out_len = _frame_put(out_len, f"\033[{i + 1};1H{line}".encode("utf-8"))
+    if len(final_output) < n_prev:
+        out_len = _frame_put(out_len, f"\033[{len(final_output) + 1};1H".encode("ascii") + CLEAR_BELOW_B) # Clear remaining bottom
+    state.prev_lines = final_output
+    
+    if not out_len:
+        return
+    
+    # One write of the finished frame
+    _write_frame(out_len)
@@ -1,27 +1,79 @@
 """Utility functions module"""
+import functools
 import os
+import time
 from .config import *
 
+# The console is queried at most this often (seconds); renders in between reuse
+# the last size. A resize shows up within one check, and render() clears on it.
+_TERM_SIZE_CHECK_INTERVAL = 0.25
+_term_size = (100, 30)
+_term_size_checked = None
+
 def get_terminal_size():
     """Get terminal dimensions."""
-    try:
-        size = os.get_terminal_size()
-        return size.columns, size.lines
-    except:
-        return 100, 30
+    global _term_size, _term_size_checked
+    now = time.monotonic()
+    if _term_size_checked is None or now - _term_size_checked >= _TERM_SIZE_CHECK_INTERVAL:
+        _term_size_checked = now
+        try:
+            size = os.get_terminal_size()
+            _term_size = (size.columns, size.lines)
+        except:
+            _term_size = (100, 30)
+    return _term_size
+
+def ttl_cache(ttl):
+    """Decorator caching a function's result per argument tuple for `ttl` seconds.
+    
+    For slow-changing data (partition layout, drive usage) read from the sampling
+    loop; exceptions propagate and are not cached.
+    """
+    def decorator(func):
+        cache = {}  # args -> (expires_at, value)
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and now < hit[0]:
+                return hit[1]
+            value = func(*args)
+            cache[args] = (now + ttl, value)
+            return value
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+# Finished bar strings keyed by (color, width, filled, empty_char, fill_char).
+# Only a few colors and widths occur per terminal size, so this stays small;
+# it is dropped wholesale if many resizes ever push it past the cap.
+_BAR_CACHE = {}
+_BAR_CACHE_MAX = 4096
 
 def draw_bar(percent, width=20, color=C_GREEN, empty_char="░", fill_char="█"):
     """Draw a colored progress bar."""
     percent = max(0, min(100, percent))
-    filled = int((percent / 100.0) * width)
-    empty = width - filled
-    return f"[{color}{fill_char * filled}{C_DIM}{empty_char * empty}{C_RESET}]"
+    filled = int(percent * width * 0.01)
+    key = (color, width, filled, empty_char, fill_char)
+    bar = _BAR_CACHE.get(key)
+    if bar is None:
+        if len(_BAR_CACHE) >= _BAR_CACHE_MAX:
+            _BAR_CACHE.clear()
+        empty = width - filled
+        bar = _BAR_CACHE[key] = f"[{color}{fill_char * filled}{C_DIM}{empty_char * empty}{C_RESET}]"
+    return bar
+
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
+@functools.lru_cache(maxsize=512)
 def format_bytes(b, suffix="/s"):
-    """Format bytes to human readable."""
+    """Format bytes to human readable.
+    
+    Memoized: totals (RAM, page file, disks, VRAM) and idle rates repeat every frame.
+    """
     b = abs(b)
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if b < 1024.0:
-            return f"{b:6.1f} {unit}{suffix}"
-        b /= 1024.0
-    return f"{b:6.1f} TB{suffix}"
+    # Unit from the integer part's bit length: every 10 bits is one step of 1024
+    unit_idx = min(max(0, (int(b).bit_length() - 1) // 10), 4)
+    return "%6.1f %s%s" % (b / (1 << (10 * unit_idx)), _BYTE_UNITS[unit_idx], suffix)
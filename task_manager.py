@@ -9,7 +9,7 @@
 import sys
 import os
 import time
-import psutil
+import threading
 
 # Check for Windows
 if sys.platform != 'win32':
@@ -21,10 +21,14 @@ try:
     from modules.config import *
     from modules.state import state
     from modules.utils import *
-    from modules.hardware import get_hardware_info, update_system_stats, update_system_stats_fast, update_system_stats_slow
+    from modules.hardware import get_hardware_info, start_gpu_poller, update_system_stats_fast, update_system_stats_slow
     from modules.processes import get_processes
-    from modules.ui import render
+    from modules.ui import frame_key, render
     from modules.input import handle_input 
+    from modules.console import (
+        begin_timer_resolution, discard_non_key_input, enable_vt_output, end_timer_resolution,
+        install_ctrl_handler, is_console_minimized, restore_output_cp, set_utf8_output, wait_for_input,
+    )
 except ImportError as e:
     print(f"Error loading modules: {e}")
     time.sleep(2)
@@ -32,15 +36,156 @@ except ImportError as e:
     time.sleep(2)
     sys.exit(1)
 
-try:
-    import modules.audio_vis
-except ImportError:
-    pass
+def _refresh_stretch(now_ns):
+    """Factor (1..ADAPTIVE_MAX_STRETCH) to stretch the stats refresh period by while CPU load is steady."""
+    if state.cpu_ema_samples < ADAPTIVE_WARMUP_SAMPLES:
+        return 1.0  # no CPU history yet to judge steadiness by
+    if now_ns - state.last_input_ns < INPUT_BOOST_SECONDS * 1_000_000_000:
+        return 1.0
+    noise = state.cpu_ema_var ** 0.5
+    if noise <= ADAPTIVE_TARGET_NOISE / ADAPTIVE_MAX_STRETCH:
+        return ADAPTIVE_MAX_STRETCH
+    return max(1.0, min(ADAPTIVE_MAX_STRETCH, ADAPTIVE_TARGET_NOISE / noise))
+
+def _request_shutdown():
+    """Ctrl+C / Ctrl+Break: stop the main loop and wake the sampler so it exits too."""
+    state.app_running = False
+    state.sampler_wake.set()
+
+def _slow_sampler():
+    """Background loop refreshing non-CPU stats and the process list, so psutil
+    and snapshot latency never delays a frame. Results are published by
+    swapping whole references on state, which the render loop only reads."""
+    while True:
+        refresh_interval = REFRESH_RATES.get(state.current_refresh_rate, 2.0)
+        # High-speed modes still refresh these only every 0.5s
+        interval = max(0.5, refresh_interval) * _refresh_stretch(time.monotonic_ns())
+        state.sampler_wake.wait(interval)
+        state.sampler_wake.clear()
+        if not state.app_running:
+            break
+        if state.party_mode or state.console_minimized:
+            continue  # audio-driven bars, or nobody looking; nothing to sample
+        try:
+            update_system_stats_slow()
+            get_processes()
+        except Exception as e:
+            state.status_message = f"Sampler error: {e}"
+
+def _run():
+    """The render/input loop. Everything it touches per iteration is bound to a
+    local first (LOAD_FAST instead of global/attribute lookups)."""
+    st = state
+    rates = REFRESH_RATES
+    # Deadlines are integer nanoseconds on the monotonic clock: no float
+    # math, and no jumps when the wall clock is adjusted
+    monotonic_ns = time.monotonic_ns
+    sleep = time.sleep
+    stretch_fn = _refresh_stretch
+    sample_cpu = update_system_stats_fast
+    frame_key_fn = frame_key
+    render_fn = render
+    input_fn = handle_input
+    wait_input = wait_for_input
+    key_pending = discard_non_key_input
+    minimized_fn = is_console_minimized
+    minimized_check_ns = int(MINIMIZED_CHECK_INTERVAL * 1e9)
+    
+    last_update = 0
+    rate_name = None
+    last_frame_key = None
+    next_minimized_check = 0
+    
+    while st.app_running:
+        now = monotonic_ns()
+        
+        # Rate-derived values only change when the speed does
+        if st.current_refresh_rate != rate_name:
+            rate_name = st.current_refresh_rate
+            refresh_interval = rates.get(rate_name, 2.0)
+            is_high_speed = refresh_interval < 0.5
+            refresh_base_ns = refresh_interval * 1e9
+            idle_sleep = max(0.001, refresh_interval * 0.5)
+            poll_window_ns = int(min(0.1, refresh_interval * 0.5) * 1e9)
+        
+        # Minimized: nobody sees the frame, so sample and draw nothing. Checked
+        # once a second while visible, and after every wake while minimized
+        if st.console_minimized or now >= next_minimized_check:
+            next_minimized_check = now + minimized_check_ns
+            minimized = minimized_fn()
+            if minimized != st.console_minimized:
+                st.console_minimized = minimized
+                if not minimized:
+                    # Restored: fresh stats and processes right away
+                    last_update = 0
+                    st.sampler_wake.set()
+            if minimized:
+                # Restoring the window queues a focus event, which wakes this;
+                # other non-key records are dropped so they don't
+                if wait_input(MINIMIZED_CHECK_INTERVAL) and key_pending():
+                    input_fn()
+                continue
+        
+        # Party mode: skip ALL psutil updates - bars are driven by audio only
+        if st.party_mode:
+            # Render in lockstep with the audio callback: wait for it to
+            # publish new bands (timeout keeps input responsive in silence)
+            visualizer = st.party_visualizer
+            if visualizer is not None:
+                visualizer.frame_ready.wait(0.05)
+                visualizer.frame_ready.clear()
+            render_fn()
+            input_fn()
+            continue
+        
+        # The sampler thread handles mem/disk/net/gpu and processes; here
+        # only CPU is sampled, every frame in high-speed modes. Steady load
+        # stretches the period (rendering is unaffected). A skipped sample
+        # (within CPU_SAMPLE_MIN_INTERVAL of the last) is retried next pass
+        if now - last_update >= int(refresh_base_ns * stretch_fn(now)):
+            if sample_cpu():
+                last_update = now
+        
+        # Skip building a frame when nothing it shows has changed
+        key = frame_key_fn()
+        if key != last_frame_key:
+            render_fn()
+            last_frame_key = key
+        
+        # Input polling - minimal delay for high-speed modes
+        if is_high_speed:
+            # Quick input check, no long polling loop
+            input_fn()
+            sleep(idle_sleep)
+        else:
+            # Slower modes: sleep on the console input handle until a key
+            # arrives or the poll window ends, instead of waking every 20ms
+            poll_end = monotonic_ns() + poll_window_ns
+            while st.app_running:
+                remaining = poll_end - monotonic_ns()
+                if remaining <= 0:
+                    break
+                # Key-ups and mouse/focus events keep the handle signaled;
+                # they are dropped here so the next wait blocks again
+                if wait_input(remaining / 1e9) and key_pending():
+                    input_fn()
 
 def main():
     """Main application loop."""
-    # Enable ANSI
-    os.system("")
+    # Enable ANSI directly on the console handle; os.system("") (which spawns
+    # cmd.exe to get the same side effect) only as a fallback
+    if not enable_vt_output():
+        os.system("")
+    
+    # Ctrl+C ends the loop cleanly through the console control handler
+    # (KeyboardInterrupt is still caught below in case it isn't installed)
+    install_ctrl_handler(_request_shutdown)
+    
+    # Frames are written to the stdout fd as raw UTF-8 bytes (see ui.render)
+    prev_output_cp = set_utf8_output()
+    
+    # 1ms sleeps for the high-speed modes on Pythons whose sleep is tick-bound
+    timer_period = begin_timer_resolution(1)
     
     # Clear screen and hide cursor
     sys.stdout.write("\033[2J\033[?25l")
@@ -49,79 +194,27 @@ def main():
     # Fetch hardware info once
     get_hardware_info()
     
-    # Prime CPU measurements
-    psutil.cpu_percent(percpu=True)
-    for proc in psutil.process_iter():
-        try:
-            proc.cpu_times()
-        except:
-            pass
+    # GPU stats are polled in the background (needs cpu_name for iGPU detection)
+    start_gpu_poller()
+    
+    # Prime CPU measurements: both CPU% figures are deltas against our own
+    # previous sample (cpu_times per core, one native snapshot for processes),
+    # so one baseline pass each is all that's needed - no per-process psutil walk
+    update_system_stats_fast()
+    update_system_stats_slow()
+    get_processes()
+    
+    # Slow stats and processes refresh in the background from here on
+    state.sampler = threading.Thread(target=_slow_sampler, name="sampler", daemon=True)
+    state.sampler.start()
     
     try:
-        last_update = 0
-        last_process_update = 0
-        frame_count = 0
-        
-        while state.app_running:
-            now = time.time()
-            refresh_interval = REFRESH_RATES.get(state.current_refresh_rate, 2.0)
-            
-            # Party mode: skip ALL psutil updates - bars are driven by audio only
-            if state.party_mode:
-                # Just render the audio visualization at max speed
-                render()
-                handle_input()
-                time.sleep(max(0.001, refresh_interval * 0.5))
-                continue
-            
-            # For high-speed modes (ultrafast), split updates:
-            # - Fast (CPU only): every frame for smooth bars
-            # - Slow (mem, disk, net, gpu): every 0.5s
-            # - Processes: every 0.5s
-            is_high_speed = refresh_interval < 0.5
-            slow_update_interval = 0.5 if is_high_speed else refresh_interval
-            
-            # Always update at refresh interval
-            if now - last_update >= refresh_interval:
-                if is_high_speed:
-                    # High-speed: only CPU stats every frame
-                    update_system_stats_fast()
-                else:
-                    # Normal: all stats every frame
-                    update_system_stats()
-                frame_count += 1
-                last_update = now
-            
-            # Slow updates (processes + non-CPU stats) less frequently
-            if now - last_process_update >= slow_update_interval:
-                if is_high_speed:
-                    update_system_stats_slow()
-                get_processes()
-                last_process_update = now
-            
-            render()
-            
-            # Input polling - minimal delay for high-speed modes
-            if is_high_speed:
-                # Quick input check, no long polling loop
-                handle_input()
-                time.sleep(max(0.001, refresh_interval * 0.5))
-            else:
-                # Normal polling for slower modes
-                poll_end = time.time() + min(0.1, refresh_interval * 0.5)
-                while time.time() < poll_end:
-                    handle_input()
-                    if not state.app_running:
-                        break
-                    time.sleep(0.02)
-                
+        _run()
     except KeyboardInterrupt:
         pass
     except Exception as e:
         # Emergency exit to see errors
-        sys.stdout.write("\033[?25h")
-        sys.stdout.write(C_RESET)
-        print(f"CRASH: {e}")
+        sys.stdout.write(f"\033[?25h{C_RESET}CRASH: {e}\n")
         import traceback
         traceback.print_exc()
     finally:
@@ -129,10 +222,11 @@ def main():
         if state.party_visualizer:
             state.party_visualizer.stop()
         
-        sys.stdout.write("\033[?25h")  # Show cursor
-        sys.stdout.write(C_RESET)
-        sys.stdout.write("\033[2J\033[H")
-        print("Exiting Task Manager... Cya!")
+        # Show cursor, reset colors, clear and say bye in one write
+        sys.stdout.write(f"\033[?25h{C_RESET}\033[2J\033[HExiting Task Manager... Cya!\n")
+        sys.stdout.flush()
+        restore_output_cp(prev_output_cp)
+        end_timer_resolution(timer_period)
         time.sleep(1)
 
 if __name__ == "__main__":